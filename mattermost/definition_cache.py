@@ -0,0 +1,174 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+
+MODULE_DIR = Path(__file__).resolve().parent
+CACHE_FILE = Path(os.getenv("EYF_DEFINITION_CACHE_FILE", MODULE_DIR / "data" / "definitions.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.getenv("EYF_DEFINITION_CACHE_SIZE", "50000"))
+CACHE_TTL = int(os.getenv("EYF_DEFINITION_CACHE_TTL", str(30 * 24 * 3600)))  # seconds
+NEGATIVE_CACHE_TTL = int(os.getenv("EYF_DEFINITION_CACHE_NEGATIVE_TTL", str(7 * 24 * 3600)))
+USED_AT_FLUSH_SIZE = 100  # reads whose time is kept in memory before being written
+USED_AT_FLUSH_INTERVAL = 60  # seconds
+
+MISS = object()
+
+
+class CacheEntry:
+    def __init__(self, definition, fetched_at):
+        self.definition = definition  # None means "no usable definition"
+        self.fetched_at = fetched_at
+
+    def is_fresh(self, now=None):
+        ttl = CACHE_TTL if self.definition is not None else NEGATIVE_CACHE_TTL
+        return (now or time.time()) - self.fetched_at < ttl
+
+
+class DefinitionCache:
+    """Persistent cache of rendered definitions, keyed by (wiki_slug, word).
+
+    Stores the final masked definition, or None when the word was rejected,
+    so a repeated word costs a SQLite lookup instead of an HTTP round-trip
+    and a full parse. Least recently used entries are evicted past
+    `max_entries`. Reading an entry does not write to disk: last use times
+    are kept in memory and written along with the next write, or once
+    USED_AT_FLUSH_SIZE of them are pending or USED_AT_FLUSH_INTERVAL passed,
+    the eviction order only needs to be roughly right.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        self._used = {}  # (wiki_slug, word) -> last use not written yet
+        self._used_flushed_at = time.monotonic()
+
+    @property
+    def db(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS definitions ("
+                " wiki_slug TEXT NOT NULL,"
+                " word TEXT NOT NULL,"
+                " definition TEXT,"
+                " fetched_at REAL NOT NULL,"
+                " used_at REAL NOT NULL,"
+                " PRIMARY KEY (wiki_slug, word))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS definitions_used_at ON definitions (used_at)")
+        return self._db
+
+    def get(self, wiki_slug, word):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT definition, fetched_at FROM definitions WHERE wiki_slug = ? AND word = ?",
+                (wiki_slug, word),
+            ).fetchone()
+            if row is None:
+                return MISS
+            self._used[(wiki_slug, word)] = time.time()
+            if len(self._used) >= USED_AT_FLUSH_SIZE or time.monotonic() - self._used_flushed_at > USED_AT_FLUSH_INTERVAL:
+                self._flush_used()
+                self.db.commit()
+            return CacheEntry(*row)
+
+    def _flush_used(self):
+        if self._used:
+            self.db.executemany(
+                "UPDATE definitions SET used_at = ? WHERE wiki_slug = ? AND word = ?",
+                [(used_at, wiki_slug, word) for (wiki_slug, word), used_at in self._used.items()],
+            )
+            self._used.clear()
+        self._used_flushed_at = time.monotonic()
+
+    def put(self, wiki_slug, word, definition):
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO definitions VALUES (?, ?, ?, ?, ?)",
+                (wiki_slug, word, definition, now, now),
+            )
+            self._used.pop((wiki_slug, word), None)
+            self._flush_used()  # in the same transaction
+            self._writes += 1
+            # counting rows is not free, only enforce the cap every few writes
+            if self._writes % 100 == 0:
+                self._evict()
+            self.db.commit()
+
+    def _evict(self):
+        (count,) = self.db.execute("SELECT COUNT(*) FROM definitions").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            logger.info(f"Evicting {overflow} definitions from cache")
+            self.db.execute(
+                "DELETE FROM definitions WHERE rowid IN "
+                "(SELECT rowid FROM definitions ORDER BY used_at LIMIT ?)",
+                (overflow,),
+            )
+
+    def playable(self, wiki_slug):
+        """{word: whether it has a usable definition} for every cached word of `wiki_slug`."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT word, definition IS NOT NULL FROM definitions WHERE wiki_slug = ?", (wiki_slug,)
+            )
+            return {word: bool(usable) for word, usable in rows}
+
+    def lookup(self, wiki_slug, word, fetch):
+        """Return the cached definition for `word`, calling `fetch` on a miss.
+
+        Expired entries are refreshed through `fetch`; if that fails the stale
+        definition is served instead, so the bot keeps running while wiktionary
+        is slow or down. Redirections (tuples) are never cached.
+        """
+        entry = self.get(wiki_slug, word)
+        if entry is not MISS and entry.is_fresh():
+            return entry.definition
+        try:
+            definition = fetch(word)
+        except Exception as e:
+            if entry is MISS:
+                raise
+            logger.warning(f"Serving stale definition for {word}: {e}")
+            return entry.definition
+        if not isinstance(definition, tuple):
+            self.put(wiki_slug, word, definition)
+        return definition
+
+    def lookup_many(self, wiki_slug, words, fetch_many):
+        """Batch version of `lookup`, `fetch_many` maps a list of words to their definitions."""
+        definitions = {}
+        stale = {}
+        for word in words:
+            entry = self.get(wiki_slug, word)
+            if entry is not MISS and entry.is_fresh():
+                definitions[word] = entry.definition
+            else:
+                stale[word] = entry
+        if not stale:
+            return definitions
+        try:
+            fetched = fetch_many(list(stale))
+        except Exception as e:
+            logger.warning(f"Serving stale definitions: {e}")
+            fetched = {}
+        for word, entry in stale.items():
+            if word in fetched:
+                definitions[word] = fetched[word]
+                if not isinstance(fetched[word], tuple):
+                    self.put(wiki_slug, word, fetched[word])
+            elif entry is not MISS:
+                definitions[word] = entry.definition
+        return definitions
+
+
+DEFINITIONS = DefinitionCache()
@@ -1,19 +1,29 @@
 import os
+import collections
 import importlib
 import math
 import random
 import string
 import threading
 import time
-from typing import List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
 
-from Levenshtein import distance
 from loguru import logger
 try:
     from .wikidict import Wikidict
+    from .features import DIFFICULTIES
+    from .scheduler import Scheduler
+    from .metrics import LatencyStats
+    from .matcher import AnswerMatcher, FOUND, CLOSE
+    from .outbound import OutboundDispatcher
     from . import scores
 except ImportError:
     from wikidict import Wikidict
+    from features import DIFFICULTIES
+    from scheduler import Scheduler
+    from metrics import LatencyStats
+    from matcher import AnswerMatcher, FOUND, CLOSE
+    from outbound import OutboundDispatcher
     import scores
 #import i18n_fr as messages
 _messages_name = "i18n_" + os.getenv("EYF_LOCALE", "fr")
@@ -31,15 +41,28 @@ TOTAL_HINT_PERCENT = 0.6
 POINTS_LIMIT = int(os.getenv("EYF_POINTS_LIMIT", "40"))
 NEXT_QUORUM_FACTOR = 0.5  # percent of players
 RETELL_DEFINITION_AFTER_MESSAGE_COUNT = 5
+NOTIFICATION_WINDOW = float(os.getenv("EYF_NOTIFICATION_WINDOW", "3"))  # seconds near misses and votes are held
+INBOUND_QUEUE_SIZE = int(os.getenv("EYF_INBOUND_QUEUE_SIZE", "100"))  # answers waiting per game
+FETCH_WORKERS = int(os.getenv("EYF_FETCH_WORKERS", "8"))  # words fetched from the wiki at once, all games together
+FETCH_RETRY_DELAY = 5  # seconds before fetching again when picking a word failed
 
 class EYFEngine:
     def __init__(self, backend, name=None, version=None):
         self.GAMES = {}
-        self.GAMES_THREADS = {}
         self.SCORE_HANDLER = scores.ScoreHandler()
+        self.scheduler = Scheduler()
+        # fetching a word may wait on the wiki for long, it never runs on the
+        # scheduler workers that judge answers and fire hints of every game
+        self.fetcher = ThreadPoolExecutor(FETCH_WORKERS, thread_name_prefix="eyf-fetch")
+        # nor do writes to disk: stats, scores, exclusions and bug reports are
+        # written one at a time by a single writer, in the order they were made
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix="eyf-writer")
+        self.ingestion = LatencyStats()  # from message receipt to verdict
+        self.dropped_answers = collections.Counter()
         self.name = os.getenv("GAME_NAME", name if name else messages.GAME_NAME)
         self.version = os.getenv("GAME_VERSION", version if version else messages.GAME_VERSION)
         self.backend = backend
+        self.outbound = OutboundDispatcher(backend)
 
     def _dump_state(self):
         logger.debug(f"Engine State: {vars(self)}")
@@ -52,10 +75,10 @@ class EYFEngine:
 
     def start(self):
         self._check_backend()
-        self.backend.post_general(messages.READY_TO_PLAY)
+        self.outbound.post_general(messages.READY_TO_PLAY)
 
     def game_post(self, channel_id, text):
-        self.backend.post_in(channel_id, text)
+        self.outbound.post_in(channel_id, text)
 
     def get_game(self, key):
         return self.GAMES.get(key)
@@ -68,18 +91,33 @@ class EYFEngine:
         try:
             game = Game(self, channel_id, channel_id, self.try_parsing_game_parameters(text))
         except Exception as e:
-            self.backend.post_general(f"Couldn't start game: {e}")
+            self.outbound.post_general(f"Couldn't start game: {e}")
             return
         self.GAMES[channel_id] = game
-        self.GAMES_THREADS[channel_id] = threading.Thread(target=game.start)
-        self.GAMES_THREADS[channel_id].start()
+        game.dispatch(game.start)
         logger.warning(messages.GAME_STARTED)
 
-    def get_scores(self, key):
-        global_scores = self.SCORE_HANDLER.get_scores(key)
+    def get_scores(self, key, page=1, window="all", everywhere=False):
+        global_scores = self.SCORE_HANDLER.get_scores(key, page, window=window, everywhere=everywhere)
         if global_scores is None:
-            return messages.NO_GAMES_RECORDED
-        return messages.LEADERBOARD.format(global_scores=global_scores)
+            return messages.NO_GAMES_RECORDED if page == 1 else messages.NO_SUCH_PAGE.format(page=page)
+        return messages.LEADERBOARD.format(
+            window=messages.LEADERBOARD_WINDOWS[window],
+            scope=messages.LEADERBOARD_EVERYWHERE if everywhere else messages.LEADERBOARD_CHANNEL,
+            global_scores=global_scores,
+        )
+
+    def get_rank(self, key, player_id, window="all", everywhere=False):
+        rank = self.SCORE_HANDLER.get_rank(key, player_id, window=window, everywhere=everywhere)
+        if rank is None:
+            return messages.NOT_RANKED.format(player_id=player_id)
+        return messages.RANK.format(
+            player_id=player_id,
+            rank=rank[0],
+            players=rank[1],
+            window=messages.LEADERBOARD_WINDOWS[window],
+            scope=messages.LEADERBOARD_EVERYWHERE if everywhere else messages.LEADERBOARD_CHANNEL,
+        )
 
     @staticmethod
     def try_parsing_game_parameters(message):
@@ -109,7 +147,9 @@ class EYFEngine:
         except ValueError:
             pass
 
-        return {"time_limit": time_limit, "points_limit": points_limit, "dictionary": dictionary}
+        difficulty = next((chunk for chunk in chunks if chunk in DIFFICULTIES), None)
+
+        return {"time_limit": time_limit, "points_limit": points_limit, "dictionary": dictionary, "difficulty": difficulty}
 
     @staticmethod
     def add_hint(current_hint, word):
@@ -141,17 +181,25 @@ class EYFEngine:
     def help():
         return messages.HELP_TEXT
 
-    def handle_mention(self, text, channel_id, _message):
+    def handle_mention(self, text, channel_id, _message, author_id=None):
         logger.debug("Handling mention ...")
         if "help" in text:
-            self.backend.reply_to(_message, self.help())
+            self.outbound.reply_to(_message, self.help())
         elif "leaderboard" in text:
-            self.backend.reply_to(_message, self.get_scores(channel_id))
+            chunks = text.split()
+            page = next((int(chunk) for chunk in chunks if chunk.isdigit() and int(chunk) > 0), 1)
+            window = next((chunk for chunk in chunks if chunk in ("day", "week")), "all")
+            everywhere = "global" in chunks
+            if "me" in chunks and author_id is not None:
+                self.outbound.reply_to(_message, self.get_rank(channel_id, author_id, window, everywhere))
+            else:
+                self.outbound.reply_to(_message, self.get_scores(channel_id, page, window, everywhere))
         elif self.has_unfinished_game(channel_id):
+            game = self.get_game(channel_id)
             if "stahp" in text:
-                self.get_game(channel_id).finish()
+                game.dispatch(game.finish)
             elif "bug" in text:
-                self.get_game(channel_id).report_bug(_message)
+                game.dispatch(game.report_bug, _message)
         else:
             self._handle_play_request(text, channel_id, _message)
 
@@ -159,7 +207,7 @@ class EYFEngine:
         logger.debug(f"Got play request: {_message}")
         lets_play = any(word in text for word in ["play", "game", "jeu", "jouer", "partie"])
         if self.has_unfinished_game(channel_id):
-            self.backend.reply_to(_message, messages.GAME_ALREADY_RUNNING)
+            self.outbound.reply_to(_message, messages.GAME_ALREADY_RUNNING)
             return
         if lets_play:
             self.new_game(text, channel_id)
@@ -167,7 +215,20 @@ class EYFEngine:
     def handle_message(self, text, channel_id, author_id, _message):
         logger.debug(f"Handling message [{text=}]")
         if self.has_unfinished_game(channel_id):
-            self.get_game(channel_id).handle_response(author_id, text.lower().strip())
+            self.get_game(channel_id).receive(author_id, text.lower().strip())
+
+    def get_outbound_stats(self):
+        return self.outbound.stats()
+
+    def get_ingestion_stats(self):
+        return {**self.ingestion.summary(), "dropped": dict(self.dropped_answers)}
+
+class GameState:
+    COUNTDOWN = "countdown"  # "next word in 5 seconds" posted, waiting
+    SHOWING = "showing"  # fetching the word, its definition is posted once it is there
+    HINTING = "hinting"  # word on display, hints revealed over time
+    REVEALED = "revealed"  # word found, skipped or timed out
+
 
 class Game:
     def __init__(self, engine, key, channel, limits):
@@ -177,8 +238,8 @@ class Game:
         self.game_start_time = time.time()
         self.word_start_time = 0
         self.word = None
+        self.matcher = None
         self.definition = None
-        self.kill_switch = False
         self.scores = {}
         self.next_list = []
         self.potential_players = []
@@ -187,147 +248,337 @@ class Game:
         self.game_config = limits
         self.received_messages = 0
         self.game_running = False
+        self.timers = []
+        self.fetching = None  # future of the word being fetched
+        self.state = None
+        self.events = collections.deque()
+        self.events_lock = threading.Lock()
+        self.processing_events = False
+        self.pending_answers = 0
+        self.round = 0  # bumped for each new word, answers for an older round are stale
+        self.word_lock = threading.RLock()  # guards word, round and next_list
+        self.close_players = []  # near misses not posted yet
+        self.vote_progress = None  # last vote count not posted yet
+        self.notifications_timer = None
+        self.notifications_lock = threading.Lock()
+        self.STATE_HANDLERS = {
+            GameState.COUNTDOWN: self._on_countdown,
+            GameState.SHOWING: self._on_showing,
+            GameState.HINTING: self._on_hinting,
+            GameState.REVEALED: self._on_revealed,
+        }
         dict_slug = Wikidict.get_dict(self.game_config["dictionary"])
         if dict_slug is None:
             raise Exception(f'Couldn\'t find dictionary {self.game_config["dictionary"]}')
-        self.wikidict = Wikidict(wiki_slug=dict_slug)
+        self.wikidict = Wikidict(wiki_slug=dict_slug, difficulty=self.game_config.get("difficulty"))
 
     def _dump_state(self):
         logger.debug(f"Game State: {vars(self)}")
         self.engine._dump_state()
 
+    # Event loop: everything that changes the state of a game is queued here and
+    # runs one event at a time, each from a fresh worker call, so transitions
+    # never nest into each other and the stack does not grow with the game
+
+    def dispatch(self, callback, *args):
+        with self.events_lock:
+            self.events.append((callback, args))
+            if self.processing_events:
+                return
+            self.processing_events = True
+        self.engine.scheduler.call_soon(self._process_events)
+
+    def _process_events(self):
+        while True:
+            with self.events_lock:
+                if not self.events:
+                    self.processing_events = False
+                    return
+                callback, args = self.events.popleft()
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.critical(e)
+
+    def schedule(self, delay, callback, *args):
+        handle = self.engine.scheduler.call_later(delay, self.dispatch, callback, *args)
+        self.timers.append(handle)
+        return handle
+
+    def persist(self, callback, *args):
+        self.engine.writer.submit(callback, *args).add_done_callback(self._check_persisted)
+
+    def _check_persisted(self, future):
+        if future.exception() is not None:
+            logger.critical(f"Game {self.key}: could not save: {future.exception()}")
+
+    def cancel_timers(self):
+        for handle in self.timers:
+            handle.cancel()
+        self.timers = []
+        self.notifications_timer = None
+
+    # Posts: near misses and vote counts are held for NOTIFICATION_WINDOW and
+    # merged in a single post, sent earlier if anything else is posted so that
+    # messages keep their order
+
+    def post(self, text):
+        self.engine.game_post(self.channel, "\n".join(self._take_notifications() + [text]))
+
+    def flush_notifications(self):
+        lines = self._take_notifications()
+        if lines:
+            self.engine.game_post(self.channel, "\n".join(lines))
+
+    def _take_notifications(self):
+        with self.notifications_lock:
+            lines = []
+            if self.close_players:
+                players = ", ".join(f"@{player_id}" for player_id in self.close_players)
+                template = messages.SO_CLOSE if len(self.close_players) == 1 else messages.SO_CLOSE_MANY
+                lines.append(template.format(players=players))
+            if self.vote_progress is not None:
+                lines.append(self.vote_progress)
+            self.close_players = []
+            self.vote_progress = None
+            if self.notifications_timer is not None:
+                self.notifications_timer.cancel()
+                self.notifications_timer = None
+            return lines
+
+    def _hold_notification(self):
+        if self.notifications_timer is None:
+            self.notifications_timer = self.schedule(NOTIFICATION_WINDOW, self.flush_notifications)
+
+    def transition(self, state):
+        self.dispatch(self._enter, state)
+
+    def _enter(self, state):
+        if self.finished:
+            return
+        logger.debug(f"Game {self.key}: {self.state} -> {state}")
+        self.state = state
+        self.STATE_HANDLERS[state]()
+
+    # States
+
     def start(self):
-        self.engine.game_post(self.channel, messages.GAME_POST_START +
+        self.post(messages.GAME_POST_START +
             f"Limite de temps : {EYFEngine.human_readable_seconds(self.game_config['time_limit'])}\n"
             f"Limite de points: {self.game_config['points_limit']}\n"
             f"Dictionnaire: {self.wikidict.get_dict_string()}"
         )
+        if not self.wikidict.forced_words:
+            self.wikidict.start_prefetch()
         self.new_word()
 
     def new_word(self):
-        self.kill_switch = False
+        self.transition(GameState.COUNTDOWN)
+
+    def _on_countdown(self):
+        self.cancel_timers()
         if time.time() - self.game_start_time > self.game_config['time_limit']:
-            self.engine.game_post(self.channel, messages.TIME_LIMIT_ACHIEVED)
+            self.post(messages.TIME_LIMIT_ACHIEVED)
             self.finish()
             return
-
-        try:
-            self._prepare_next_word()
-            if self.kill_switch:
-                return
-            self._process_current_word()
-        except Exception as e:
-            logger.critical(e)
-
-    def _prepare_next_word(self):
-        self.word = None
-        self.next_list = []
-        self.engine.game_post(self.channel, messages.NEXT_WORD_5_SECONDS)
+        self.resolve()
+        with self.word_lock:
+            self.next_list = []
+        self.post(messages.NEXT_WORD_5_SECONDS)
         self._dump_state()
-        time.sleep(5)
+        self.schedule(5, self._enter, GameState.SHOWING)
 
-    def _process_current_word(self):
+    def _on_showing(self):
         self.word_start_time = time.time()
-        self.word, self.definition = self.wikidict.get_word_and_definition()
-        logger.info(f"Got word {self.word}, def={self.definition[:32]}...")
-        current_word = self.word
-        self.current_hint = "".join(["_" if l in string.ascii_lowercase else l for l in current_word])
-        self._post_word_info()
-        self._reveal_hints(current_word)
-        self._post_word_reveal_result(current_word)
-
-    def _post_word_info(self):
-        indication = f"{len(self.word)} lettres"
-        number_of_words = self.word.count(" ") + self.word.count("-") + 1
+        fetch_round = self.round
+        self.fetching = self.engine.fetcher.submit(self.wikidict.get_word_and_definition)
+        self.fetching.add_done_callback(lambda future: self.dispatch(self._on_word_ready, fetch_round, future))
+
+    def _on_word_ready(self, fetch_round, future):
+        # the game may have been stopped while the word was fetched
+        if self.finished or self.state != GameState.SHOWING or fetch_round != self.round or future.cancelled():
+            return
+        self.fetching = None
+        try:
+            word, self.definition = future.result()
+        except Exception as e:
+            logger.critical(f"Game {self.key}: could not pick a word: {e}")
+            self.schedule(FETCH_RETRY_DELAY, self._enter, GameState.SHOWING)
+            return
+        logger.info(f"Got word {word}, def={self.definition[:32]}...")
+        # lazy: computing percentiles sorts the latency samples
+        logger.opt(lazy=True).debug("Prefetch stats: {}", self.wikidict.get_prefetch_stats)
+        logger.opt(lazy=True).debug("Ingestion stats: {}", self.engine.get_ingestion_stats)
+        logger.opt(lazy=True).debug("Outbound stats: {}", self.engine.get_outbound_stats)
+        self.current_hint = "".join(["_" if l in string.ascii_lowercase else l for l in word])
+        matcher = AnswerMatcher(word)
+        with self.word_lock:
+            self.word, self.matcher = word, matcher
+            self.round += 1
+        self._post_word_info(word)
+        self.transition(GameState.HINTING)
+
+    def _on_hinting(self):
+        current_round = self.round
+        max_hints = round(TOTAL_HINT_PERCENT / PERCENT_PER_HINT)
+        for i in range(1, max_hints + 1):
+            self.schedule(i * TIME_PER_HINT, self._reveal_hint, current_round)
+        time_left_for_word = WORD_TIME_LIMIT - (time.time() - self.word_start_time)
+        self.schedule(max(time_left_for_word, max_hints * TIME_PER_HINT), self._post_word_reveal_result, current_round)
+
+    def _on_revealed(self):
+        self.resolve()
+        self.cancel_timers()
+        self.transition(GameState.COUNTDOWN)
+
+    def _post_word_info(self, word):
+        indication = f"{len(word)} lettres"
+        number_of_words = word.count(" ") + word.count("-") + 1
         if number_of_words > 1:
             indication += f", {number_of_words} mots"
-        self.engine.game_post(self.channel, f"{indication} : \n{self.definition}")
+        self.post(f"{indication} : \n{self.definition}")
 
-    def _reveal_hints(self, current_word):
-        max_hints = round(TOTAL_HINT_PERCENT / PERCENT_PER_HINT)
-        for _ in range(max_hints):
-            time.sleep(TIME_PER_HINT)
-            if current_word != self.word:
+    def _reveal_hint(self, hint_round):
+        # holding the lock keeps the word from being found while its hint is posted
+        with self.word_lock:
+            current_word = self.word
+            if current_word is None or hint_round != self.round:
                 return
             self.current_hint = EYFEngine.add_hint(self.current_hint, current_word)
             if self.received_messages >= RETELL_DEFINITION_AFTER_MESSAGE_COUNT:
-                self._post_word_info()
-            self.engine.game_post(self.channel, messages.HINT.format(hint=self.current_hint))
+                self._post_word_info(current_word)
+            self.post(messages.HINT.format(hint=self.current_hint))
             self.received_messages = 0
 
-    def _post_word_reveal_result(self, current_word):
-        time_elapsed_for_word = time.time() - self.word_start_time
-        if time_elapsed_for_word < WORD_TIME_LIMIT:
-            time.sleep(WORD_TIME_LIMIT - time_elapsed_for_word)
-
-        if current_word == self.word:
-            current_word = self.word
-            self.word = None
-            self.engine.game_post(self.channel, messages.NO_ONE_FOUND_WORD.format(current_word=current_word))
-            self.new_word()
-
-    def found(self, player_id):
-        current_word = self.word
-        self.word = None
+    def _post_word_reveal_result(self, reveal_round):
+        current_word = self.resolve(reveal_round)
+        if current_word is not None:
+            self.persist(self.wikidict.record_result, current_word, False)
+            self.post(messages.NO_ONE_FOUND_WORD.format(current_word=current_word))
+            self.transition(GameState.REVEALED)
+
+    def resolve(self, expected_round=None):
+        """Take the current word off the table, atomically.
+
+        Returns the word to the first caller only; later callers, or callers
+        for a round that is already over, get None. Whoever gets the word is
+        the one allowed to score it, skip it or reveal it.
+        """
+        with self.word_lock:
+            if self.word is None or (expected_round is not None and expected_round != self.round):
+                return None
+            current_word, self.word = self.word, None
+            return current_word
+
+    # Players actions
+
+    def found(self, player_id, answer_round=None):
+        current_word = self.resolve(answer_round)
+        if current_word is None:
+            return
+        self.persist(self.wikidict.record_result, current_word, True)
         self.scores[player_id] = self.scores.get(player_id, 0) + self.current_hint.count("_")
 
         if self.scores[player_id] >= self.game_config["points_limit"]:
-            self.engine.game_post(
-                self.channel,
+            self.post(
                 messages.WORD_FOUND.format(player_id=player_id, points=self.current_hint.count('_'), current_word=current_word) + messages.SCORE_LIMIT_REACHED
             )
             self.finish()
         else:
-            self.engine.game_post(
-                self.channel,
+            self.post(
                 messages.WORD_FOUND.format(player_id=player_id, points=self.current_hint.count('_'), current_word=current_word)
             )
-            self.new_word()
+            self.transition(GameState.REVEALED)
 
-    def next(self, player_id):
-        if self.word is not None and player_id not in self.next_list:
+    def next(self, player_id, answer_round=None):
+        with self.word_lock:
+            if self.word is None or player_id in self.next_list:
+                return
+            if answer_round is not None and answer_round != self.round:
+                return
             self.next_list.append(player_id)
-            if len(self.next_list) >= len(self.potential_players) * NEXT_QUORUM_FACTOR:
-                current_word = self.word
-                self.word = None
-                self.engine.game_post(self.channel, messages.NEXT_MESSAGE.format(current_word=current_word))
-                self.wikidict.exclude(current_word)
-                self.new_word()
-            else:
-                self.engine.game_post(
-                    self.channel,
-                    messages.VOTING_TO_NEXT.format(current_votes=len(self.next_list), votes_needed=math.ceil(len(self.potential_players) * NEXT_QUORUM_FACTOR))
-                )
+            votes = len(self.next_list)
+            current_word = None
+            if votes >= len(self.potential_players) * NEXT_QUORUM_FACTOR:
+                current_word = self.resolve()
+        if current_word is not None:
+            self.post(messages.NEXT_MESSAGE.format(current_word=current_word))
+            self.persist(self.wikidict.record_result, current_word, False)
+            self.persist(self.wikidict.exclude, current_word)
+            self.transition(GameState.REVEALED)
+        else:
+            with self.notifications_lock:
+                self.vote_progress = messages.VOTING_TO_NEXT.format(current_votes=votes, votes_needed=math.ceil(len(self.potential_players) * NEXT_QUORUM_FACTOR))
+                self._hold_notification()
 
     def soclose(self, player_id):
-        self.engine.game_post(self.channel, f"@{player_id} est très proche !")
+        with self.notifications_lock:
+            if player_id not in self.close_players:
+                self.close_players.append(player_id)
+            self._hold_notification()
 
     def potential(self, player_id):
         if player_id not in self.potential_players:
             self.potential_players.append(player_id)
 
     def finish(self):
-        self.word = None
+        if self.finished:
+            return
+        self.resolve()
         self.finished = True
-        self.kill_switch = True
+        self.cancel_timers()
+        if self.fetching is not None:
+            self.fetching.cancel()  # only if no fetch worker took it yet
         self.received_messages = 0
-        self.engine.SCORE_HANDLER.update(self.key, self.scores)
-        self.engine.game_post(self.channel, messages.FINISH_SCORES.format(scores=self.engine.get_score_string(self.scores)))
+        self.persist(self.engine.SCORE_HANDLER.update, self.key, dict(self.scores))
+        self.post(messages.FINISH_SCORES.format(scores=self.engine.get_score_string(self.scores)))
 
     def report_bug(self, message):
-        if self.word is not None:
-            self.wikidict.bug_report(self.word, message.content)
-            self.engine.game_post(self.channel, messages.BUG_REPORT.format(word=self.word))
-            self.new_word()
+        current_word = self.resolve()
+        if current_word is not None:
+            self.persist(self.wikidict.bug_report, current_word, message.content)
+            self.persist(self.wikidict.mark_unplayable, current_word, True)
+            self.post(messages.BUG_REPORT.format(word=current_word))
+            self.transition(GameState.REVEALED)
+
+    # Inbound answers: the listener only queues them, the verdict is given on the
+    # game's event queue by one of the scheduler workers, which never wait on
+    # the wiki nor on the disk
+
+    def receive(self, player_id, response):
+        received_at = time.monotonic()
+        with self.events_lock:
+            if self.pending_answers >= INBOUND_QUEUE_SIZE:
+                self.engine.dropped_answers["backpressure"] += 1
+                return False
+            self.pending_answers += 1
+        self.dispatch(self._handle_answer, self.round, player_id, response, received_at)
+        return True
+
+    def _handle_answer(self, answer_round, player_id, response, received_at):
+        with self.events_lock:
+            self.pending_answers -= 1
+        if answer_round != self.round or self.word is None:
+            self.engine.dropped_answers["stale"] += 1
+        else:
+            self.handle_response(player_id, response, answer_round)
+        self.engine.ingestion.record(time.monotonic() - received_at)
 
-    def handle_response(self, player_id, response):
+    def handle_response(self, player_id, response, answer_round=None):
         logger.debug(f"Handling response: {response}")
-        if self.word is not None:
-            self.received_messages += 1
-            self.potential(player_id)
-            if response == "next":
-                self.next(player_id)
-            elif response == self.word:
-                self.found(player_id)
-            elif distance(response, self.word) < 3:
-                self.soclose(player_id)
+        with self.word_lock:
+            current_word, matcher, current_round = self.word, self.matcher, self.round
+        if current_word is None:
+            return
+        if answer_round is None:
+            answer_round = current_round
+        self.received_messages += 1
+        self.potential(player_id)
+        if response == "next":
+            self.next(player_id, answer_round)
+            return
+        verdict = matcher.match(response)
+        if verdict == FOUND:
+            self.found(player_id, answer_round)
+        elif verdict == CLOSE:
+            self.soclose(player_id)
@@ -48,7 +48,8 @@ class EnlargeYourFrench(Plugin):
             self.engine.handle_mention(
                 text=message.text,
                 channel_id=message.channel_id,
-                _message=message
+                _message=message,
+                author_id=message.sender_name
             )
         elif not self.engine.has_unfinished_game(message.channel_id):
             self.engine._handle_play_request(
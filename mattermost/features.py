@@ -0,0 +1,263 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from loguru import logger
+
+MODULE_DIR = Path(__file__).resolve().parent
+STATS_FILE = Path(os.getenv("EYF_WORD_STATS_FILE", MODULE_DIR / "data" / "word_stats.sqlite3"))
+DIFFICULTIES = ("easy", "medium", "hard")
+MIN_GAMES_FOR_SOLVE_RATE = int(os.getenv("EYF_MIN_GAMES_FOR_SOLVE_RATE", "5"))
+INDEX_REBUILD_INTERVAL = int(os.getenv("EYF_INDEX_REBUILD_INTERVAL", "3600"))  # seconds, when results came in
+UNKNOWN_WEIGHT = 1.0  # definition never fetched yet
+PLAYABLE_WEIGHT = 2.0  # known to have a usable definition, drawn more often
+UNKNOWN, UNPLAYABLE, PLAYABLE = -1, 0, 1
+
+
+def difficulty_of(length, word_count, shown, solved):
+    """Difficulty bucket of a word: its solve rate once it has been played enough, its shape until then."""
+    if shown >= MIN_GAMES_FOR_SOLVE_RATE:
+        solve_rate = solved / shown
+        return "easy" if solve_rate >= 0.6 else "hard" if solve_rate < 0.3 else "medium"
+    if word_count > 1 or length >= 10:
+        return "hard"
+    return "easy" if length <= 6 else "medium"
+
+
+class AliasTable:
+    """Vose's alias method: draws an index with a probability proportional to its weight in O(1)."""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = sum(weights)
+        self.probabilities = array("d", [0.0] * n)
+        self.aliases = array("I", range(n))
+        scaled = [weight * n / total for weight in weights] if total else []
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large[-1]
+            self.probabilities[s] = scaled[s]
+            self.aliases[s] = l
+            scaled[l] -= 1 - scaled[s]
+            if scaled[l] < 1:
+                small.append(large.pop())
+        for i in small + large:  # leftovers are 1 up to rounding errors
+            self.probabilities[i] = 1.0
+        self.total = total
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def sample(self):
+        i = random.randrange(len(self.probabilities))
+        return i if random.random() < self.probabilities[i] else self.aliases[i]
+
+
+class WordStats:
+    """How many times each word was shown and found in games, and which words were
+    reported as unplayable, persisted in SQLite."""
+
+    def __init__(self, path=STATS_FILE):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self._db = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS word_stats ("
+                " wiki_slug TEXT NOT NULL,"
+                " word TEXT NOT NULL,"
+                " shown INTEGER NOT NULL,"
+                " solved INTEGER NOT NULL,"
+                " PRIMARY KEY (wiki_slug, word)) WITHOUT ROWID"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS unplayable ("
+                " wiki_slug TEXT NOT NULL,"
+                " word TEXT NOT NULL,"
+                " PRIMARY KEY (wiki_slug, word)) WITHOUT ROWID"
+            )
+        return self._db
+
+    def record(self, wiki_slug, word, solved):
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO word_stats VALUES (?, ?, 1, ?) ON CONFLICT (wiki_slug, word)"
+                " DO UPDATE SET shown = shown + 1, solved = solved + excluded.solved",
+                (wiki_slug, word, int(solved)),
+            )
+            self.db.commit()
+
+    def get_all(self, wiki_slug):
+        with self.lock:
+            rows = self.db.execute("SELECT word, shown, solved FROM word_stats WHERE wiki_slug = ?", (wiki_slug,))
+            return {word: (shown, solved) for word, shown, solved in rows}
+
+    def mark_unplayable(self, wiki_slug, word):
+        with self.lock:
+            self.db.execute("INSERT OR IGNORE INTO unplayable VALUES (?, ?)", (wiki_slug, word))
+            self.db.commit()
+
+    def get_unplayable(self, wiki_slug):
+        with self.lock:
+            return {word for word, in self.db.execute("SELECT word FROM unplayable WHERE wiki_slug = ?", (wiki_slug,))}
+
+
+class DifficultyIndex:
+    """Per-word features of one word list, and an alias table per difficulty.
+
+    Features are arrays indexed like the word list: length, number of words,
+    whether a usable definition is known, and how often the word was shown
+    and found. They come from the word list, the definitions already cached
+    or stored offline and the games history, so building the index needs no
+    network. Words known to have no usable definition are left out, and those
+    known to be playable are drawn more often than never fetched ones.
+
+    Results recorded after the build update the features right away, and a
+    word whose difficulty changed is no longer drawn from its old bucket. It
+    joins its new bucket when the index is rebuilt, see DifficultyIndexRegistry.
+    """
+
+    def __init__(self, wordlist, playable, stats):
+        self.wordlist = wordlist
+        self.built_at = time.monotonic()
+        self.changed = False  # results recorded since the build
+        size = wordlist.size
+        self.lengths = array("H", [0] * size)
+        self.word_counts = array("B", [0] * size)
+        self.playable = array("b", [UNKNOWN] * size)
+        self.shown = array("I", [0] * size)
+        self.solved = array("I", [0] * size)
+        self.unplayable = set()  # found out since the index was built
+        members = {difficulty: array("I") for difficulty in DIFFICULTIES}
+        weights = {difficulty: [] for difficulty in DIFFICULTIES}
+        for i in range(size):
+            word = wordlist.word_at(i)
+            length = len(word)
+            word_count = min(255, word.count(" ") + word.count("-") + 1)
+            self.lengths[i] = min(length, 65535)
+            self.word_counts[i] = word_count
+            known = playable.get(word)
+            if known is not None:
+                self.playable[i] = PLAYABLE if known else UNPLAYABLE
+            shown, solved = stats.get(word, (0, 0))
+            self.shown[i], self.solved[i] = shown, solved
+            if known is False:
+                continue
+            difficulty = difficulty_of(length, word_count, shown, solved)
+            members[difficulty].append(i)
+            weights[difficulty].append(PLAYABLE_WEIGHT if known else UNKNOWN_WEIGHT)
+        self.members = members
+        self.tables = {difficulty: AliasTable(weights[difficulty]) for difficulty in DIFFICULTIES}
+
+    def bucket_sizes(self):
+        return {difficulty: len(self.members[difficulty]) for difficulty in DIFFICULTIES}
+
+    def mark_unplayable(self, word):
+        self.unplayable.add(word)
+        i = self.wordlist.index_of(word)
+        if i is not None:
+            self.playable[i] = UNPLAYABLE
+
+    def record_result(self, word, solved):
+        i = self.wordlist.index_of(word)
+        if i is None:
+            return
+        self.shown[i] += 1
+        self.solved[i] += int(solved)
+        self.changed = True
+
+    def difficulty_at(self, i):
+        return difficulty_of(self.lengths[i], self.word_counts[i], self.shown[i], self.solved[i])
+
+    def _pick_difficulty(self):
+        draw = random.random() * sum(table.total for table in self.tables.values())
+        for difficulty in DIFFICULTIES:
+            draw -= self.tables[difficulty].total
+            if draw < 0:
+                return difficulty
+        return DIFFICULTIES[-1]
+
+    def _eligible(self, i, difficulty=None):
+        """The word at `i` if it may be drawn for `difficulty`, else None."""
+        if difficulty is not None and self.difficulty_at(i) != difficulty:
+            return None  # moved to another bucket since the build
+        word = self.wordlist.word_at(i)
+        if word in self.wordlist.excluded or word in self.unplayable:
+            return None
+        return word
+
+    def _draw(self, difficulty=None):
+        for _ in range(100):
+            bucket = difficulty or self._pick_difficulty()
+            word = self._eligible(self.members[bucket][self.tables[bucket].sample()], difficulty)
+            if word is not None:
+                return word
+        # nearly everything was excluded, don't rely on luck
+        buckets = [difficulty] if difficulty is not None else DIFFICULTIES
+        eligible = [i for bucket in buckets for i in self.members[bucket] if self._eligible(i, difficulty) is not None]
+        return self.wordlist.word_at(random.choice(eligible)) if eligible else None
+
+    def sample(self, difficulty=None):
+        """Draw a word of `difficulty`, or of any difficulty in proportion to their weights.
+
+        Words known to be unplayable are never drawn, even when no word of
+        `difficulty` is left and any difficulty is drawn instead.
+        """
+        word = None
+        if difficulty is not None and self.tables[difficulty].total:
+            word = self._draw(difficulty)
+        if word is None and any(table.total for table in self.tables.values()):
+            word = self._draw()
+        if word is None:
+            raise IndexError("no playable word left")
+        return word
+
+
+class DifficultyIndexRegistry:
+    """One index per `Wikidict.WIKIS` slug, rebuilt when its word list is reloaded,
+    and every INDEX_REBUILD_INTERVAL seconds if results were recorded meanwhile."""
+
+    def __init__(self):
+        self.INDEXES = {}
+        self.STATS = WordStats()
+        self.lock = threading.Lock()
+
+    def get(self, wikidict):
+        with self.lock:
+            index = self.INDEXES.get(wikidict.wiki_slug)
+            if index is None or index.wordlist is not wikidict.wordlist or (
+                index.changed and time.monotonic() - index.built_at > INDEX_REBUILD_INTERVAL
+            ):
+                logger.info(f"Indexing word features of {wikidict.wiki_slug} ...")
+                playable = wikidict.known_playable()
+                playable.update(dict.fromkeys(self.STATS.get_unplayable(wikidict.wiki_slug), False))
+                index = DifficultyIndex(wikidict.wordlist, playable, self.STATS.get_all(wikidict.wiki_slug))
+                logger.info(f"Indexed {wikidict.wiki_slug}: {index.bucket_sizes()}")
+                self.INDEXES[wikidict.wiki_slug] = index
+            return index
+
+    def record_result(self, wikidict, word, solved):
+        self.STATS.record(wikidict.wiki_slug, word, solved)
+        index = self.INDEXES.get(wikidict.wiki_slug)
+        if index is not None:
+            index.record_result(word, solved)
+
+    def mark_unplayable(self, wikidict, word, reported=False):
+        """Keep `word` from being drawn again; for good if it was `reported` by players."""
+        if reported:
+            self.STATS.mark_unplayable(wikidict.wiki_slug, word)
+        self.get(wikidict).mark_unplayable(word)
+
+
+INDEXES = DifficultyIndexRegistry()
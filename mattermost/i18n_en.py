@@ -13,6 +13,7 @@ READY_TO_PLAY = ":white_check_mark: Ready to play"
 # Error & Info Messages
 GAME_ALREADY_RUNNING = "A game is already in progress, go play with them instead"
 NO_GAMES_RECORDED = "No games recorded on this channel"
+NO_SUCH_PAGE = "There is no page {page} in this leaderboard"
 
 # Game messages
 GAME_STARTING = "game starting ..."
@@ -25,12 +26,19 @@ WORD_FOUND = "@{player_id} wins {points} points on ***{current_word}***.\n"
 SCORE_LIMIT_REACHED = "Score limit reached!"
 NEXT_MESSAGE = "Pass. The word was ***{current_word}*** \n"
 VOTING_TO_NEXT = "Pass ({current_votes}/{votes_needed})"
+SO_CLOSE = "{players} is very close!"
+SO_CLOSE_MANY = "{players} are very close!"
 
 # Hints
 HINT = "**Hint** : `{hint}`"
 
 # Score messages
-LEADERBOARD = "All-time scores on this channel: \n{global_scores}"
+LEADERBOARD = "{window} scores {scope}: \n{global_scores}"
+LEADERBOARD_WINDOWS = {"day": "Today's", "week": "This week's", "all": "All-time"}
+LEADERBOARD_CHANNEL = "on this channel"
+LEADERBOARD_EVERYWHERE = "on all channels"
+RANK = "<@{player_id}>: #{rank} of {players}, {window} scores {scope}"
+NOT_RANKED = "<@{player_id}> has no score in this leaderboard yet"
 FINISH_SCORES = "It's over! Scores: {scores}"
 
 # Bug report
@@ -41,7 +49,11 @@ HELP_TEXT = """
         Available commands outside the game:
         'play' : starts a game
         'play N minutes M points' : starts a game in N minutes or M points
+        'play easy|medium|hard' : starts a game with easy, medium or hard words
         'leaderboard' : shows the total scores of the channel
+        'leaderboard N' : shows the N-th page of the scores
+        'leaderboard day|week' : today's or this week's scores, 'leaderboard global' : scores of all channels
+        'leaderboard me' : your rank in the leaderboard
         'help' : shows this help
         Available commands in-game:
         'next' : vote to skip to the next word
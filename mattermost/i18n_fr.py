@@ -13,6 +13,7 @@ READY_TO_PLAY = ":white_check_mark: Prêt à jouer"
 # Error & Info Messages
 GAME_ALREADY_RUNNING = "Une partie est déjà en cours, allez jouer avec eux plutôt"
 NO_GAMES_RECORDED = "Aucune partie enregistrée sur ce salon"
+NO_SUCH_PAGE = "Il n'y a pas de page {page} dans ce classement"
 
 # Game messages
 GAME_STARTING = "game starting ..."
@@ -25,12 +26,19 @@ WORD_FOUND = "@{player_id} gagne {points} points sur ***{current_word}***.\n"
 SCORE_LIMIT_REACHED = "Limite de score atteinte !"
 NEXT_MESSAGE = "Passe. Le mot était ***{current_word}*** \n"
 VOTING_TO_NEXT = "Passe ({current_votes}/{votes_needed})"
+SO_CLOSE = "{players} est très proche !"
+SO_CLOSE_MANY = "{players} sont très proches !"
 
 # Hints
 HINT = "**Indice** : `{hint}`"
 
 # Score messages
-LEADERBOARD = "Les scores de tout temps sur ce salon : \n{global_scores}"
+LEADERBOARD = "Les scores {window} {scope} : \n{global_scores}"
+LEADERBOARD_WINDOWS = {"day": "du jour", "week": "de la semaine", "all": "de tout temps"}
+LEADERBOARD_CHANNEL = "sur ce salon"
+LEADERBOARD_EVERYWHERE = "sur tous les salons"
+RANK = "<@{player_id}> : n°{rank} sur {players} au classement {window} {scope}"
+NOT_RANKED = "<@{player_id}> n'a pas encore de score dans ce classement"
 FINISH_SCORES = "C'est fini ! Scores: {scores}"
 
 # Bug report
@@ -41,7 +49,11 @@ HELP_TEXT = """
         Commandes disponibles hors jeu:
         'play' : lance une partie
         'play N minutes M points' : lance une partie en N minutes ou M points
+        'play easy|medium|hard' : lance une partie avec des mots faciles, moyens ou difficiles
         'leaderboard' : affiche le total des scores du canal
+        'leaderboard N' : affiche la N-ième page des scores
+        'leaderboard day|week' : scores du jour ou de la semaine, 'leaderboard global' : scores de tous les salons
+        'leaderboard me' : ton rang dans le classement
         'help' : affiche cet aide
         Commandes disponibles en jeu:
         'next' : vote pour passer au mot suivant
@@ -0,0 +1,85 @@
+import bisect
+import datetime
+import time
+
+
+class Leaderboard:
+    """Players of one channel, kept sorted by win rate as scores come in.
+
+    `keys` is a sorted list of (-win_rate, player) and `entries` maps every
+    player to its key, so a rank is a bisection and a page is a slice; an
+    update only moves the players of the finished game.
+    """
+
+    def __init__(self, scores=None):
+        self.entries = {player: (-score["win_rate"], player) for player, score in (scores or {}).items()}
+        self.keys = sorted(self.entries.values())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def update(self, player, win_rate):
+        key = self.entries.get(player)
+        if key is not None:
+            del self.keys[bisect.bisect_left(self.keys, key)]
+        key = (-win_rate, player)
+        self.entries[player] = key
+        bisect.insort(self.keys, key)
+
+    def page(self, page, size):
+        """Players of the 1-based `page` of `size` players."""
+        start = (page - 1) * size
+        return [player for _, player in self.keys[start:start + size]]
+
+    def rank(self, player):
+        """1-based rank of `player`, None if they never played in this channel."""
+        key = self.entries.get(player)
+        if key is None:
+            return None
+        return bisect.bisect_left(self.keys, key) + 1
+
+
+WINDOWS = ("day", "week", "all")
+
+
+def period_of(window, timestamp):
+    """Calendar period of `timestamp` for `window`, games of the same period are added up."""
+    if window == "day":
+        return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+    if window == "week":
+        return time.strftime("%G-W%V", time.localtime(timestamp))
+    return "all"
+
+
+def window_start(window, timestamp):
+    """Timestamp of the beginning of the period of `timestamp`."""
+    if window == "all":
+        return 0
+    day = datetime.date.fromtimestamp(timestamp)
+    if window == "week":
+        day -= datetime.timedelta(days=day.weekday())
+    return time.mktime(day.timetuple())
+
+
+class ScoreWindow:
+    """Scores of one scope (a channel, or every channel) over one period.
+
+    Totals are added up as games finish and indexed in a Leaderboard, so
+    reading a page of the period's leaderboard never rescans past games.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.players = {}  # player -> [total_points, games_played, performance_sum]
+        self.leaderboard = Leaderboard()
+
+    def add(self, player, points, performance, games=1):
+        totals = self.players.setdefault(player, [0, 0, 0.0])
+        totals[0] += points
+        totals[1] += games
+        totals[2] += performance
+        self.leaderboard.update(player, totals[2] / totals[1])
+
+    def score(self, player):
+        total_points, games_played, performance_sum = self.players[player]
+        return {"total_points": total_points, "games_played": games_played, "win_rate": performance_sum / games_played}
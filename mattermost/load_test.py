@@ -0,0 +1,186 @@
+"""Runs thousands of simulated games against the engine, without Mattermost nor wiktionary.
+
+    poetry run python load_test.py
+    poetry run python load_test.py race
+    poetry run python load_test.py standin
+
+Games play forced words, fake players answer at random, and the backend only
+counts posts. Reports thread count, scheduler lag, throughput and answer
+ingestion latency (p50/p99 from receipt to verdict). In every mode, scores,
+word stats and the definition cache are written to a temporary directory.
+
+`race` fires thousands of simultaneous correct answers at a single game,
+straight from many threads, and checks that every word has exactly one winner.
+
+`standin` plays real words fetched from a slow `wiki_standin.py` instead, so
+that games keep waiting on the wiki while answers come in, then stops every
+game with `stahp` and reports how long it took, even for games still fetching.
+"""
+import os
+import collections
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+GAMES = int(os.getenv("LOAD_TEST_GAMES", "2000"))
+DURATION = int(os.getenv("LOAD_TEST_DURATION", "30"))  # seconds
+ANSWERS_PER_SECOND = int(os.getenv("LOAD_TEST_ANSWERS_PER_SECOND", "2000"))
+RACE_ROUNDS = int(os.getenv("LOAD_TEST_RACE_ROUNDS", "5"))
+RACE_THREADS = int(os.getenv("LOAD_TEST_RACE_THREADS", "64"))
+RACE_ANSWERS = int(os.getenv("LOAD_TEST_RACE_ANSWERS", "100"))  # per thread and word
+STANDIN_GAMES = int(os.getenv("LOAD_TEST_STANDIN_GAMES", "200"))
+STANDIN_LATENCY = float(os.getenv("LOAD_TEST_STANDIN_LATENCY", "2"))  # seconds per wiki request
+STANDIN_PORT = int(os.getenv("LOAD_TEST_STANDIN_PORT", "8900"))
+MODE = sys.argv[1] if sys.argv[1:] else "load"
+
+os.environ.setdefault("EYF_WORD_TIME_LIMIT", "8")
+os.environ.setdefault("EYF_TIME_PER_HINT", "2")
+os.environ.setdefault("EYF_PREFETCH_DEPTH", "0")
+# fake definitions, results and scores must never end up in the real stores
+DATA_DIR = tempfile.mkdtemp(prefix="eyf-load-test-")
+os.environ["EYF_DEFINITION_CACHE_FILE"] = os.path.join(DATA_DIR, "definitions.sqlite3")
+os.environ["EYF_WORD_STATS_FILE"] = os.path.join(DATA_DIR, "word_stats.sqlite3")
+os.environ["EYF_SCORES_FILE"] = os.path.join(DATA_DIR, "scores.sqlite3")
+if MODE == "standin":
+    os.environ.setdefault("EYF_WIKI_API_URL", f"http://localhost:{STANDIN_PORT}/w/api.php")
+else:
+    os.environ.setdefault(
+        "EYF_FORCED_WORDS",
+        "||".join(f"mot{i}=Définition de test numéro {i}" for i in range(500)),
+    )
+
+from loguru import logger  # noqa: E402
+from engine import EYFEngine  # noqa: E402
+
+
+class CountingBackend:
+    def __init__(self):
+        self.posts = 0
+        self.winners = collections.Counter()  # word -> number of "found" posts
+        self.lock = threading.Lock()
+
+    def reply_to(self, _message, text):
+        self.post_in(None, text)
+
+    def post_general(self, text):
+        self.post_in(None, text)
+
+    def post_in(self, channel_id, text):
+        with self.lock:
+            self.posts += 1
+            for line in text.splitlines():  # posts may be merged
+                if line.startswith("@player-") and "***" in line:
+                    self.winners[line.split("***")[1]] += 1
+
+
+def measure_scheduler_lag(engine, samples):
+    def probe(scheduled_at):
+        samples.append(time.monotonic() - scheduled_at - 0.1)
+    engine.scheduler.call_later(0.1, probe, time.monotonic())
+
+
+def main(games=GAMES):
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    backend = CountingBackend()
+    engine = EYFEngine(backend=backend)
+    engine.start()
+    channels = [f"channel-{i}" for i in range(games)]
+    start = time.time()
+    for channel in channels:
+        engine.new_game("play 60 minutes 100000 points", channel)
+    print(f"started {games} games in {time.time() - start:.1f}s")
+
+    lags = []
+    answers = 0
+    deadline = time.time() + DURATION
+    while time.time() < deadline:
+        tick = time.time()
+        for _ in range(ANSWERS_PER_SECOND // 10):
+            channel = random.choice(channels)
+            game = engine.get_game(channel)
+            word = game.word if game else None
+            if word is None:
+                continue
+            answer = word if random.random() < 0.2 else word[:-1] + "x"
+            engine.handle_message(answer, channel, f"player-{random.randrange(5)}", None)
+            answers += 1
+        measure_scheduler_lag(engine, lags)
+        time.sleep(max(0, 0.1 - (time.time() - tick)))
+
+    elapsed = time.time() - start
+    lags = sorted(lags)  # probes may still be appending
+    print(f"threads: {threading.active_count()}")
+    print(f"answers handled: {answers} ({answers / DURATION:.0f}/s)")
+    print(f"posts: {backend.posts} ({backend.posts / elapsed:.0f}/s)")
+    if lags:
+        print(f"scheduler lag: median {statistics.median(lags) * 1000:.1f} ms, max {lags[-1] * 1000:.1f} ms")
+    print(f"ingestion: {engine.get_ingestion_stats()}")
+    print(f"outbound: {engine.get_outbound_stats()}")
+    return engine
+
+
+def standin():
+    server = subprocess.Popen(
+        [sys.executable, "-u", "wiki_standin.py", "--port", str(STANDIN_PORT), "--latency", str(STANDIN_LATENCY)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.PIPE, text=True,
+    )
+    print(server.stdout.readline().strip())  # serving, once the word list is loaded
+    print(f"wiki latency: {STANDIN_LATENCY:.1f}s per request")
+    try:
+        engine = main(STANDIN_GAMES)
+        fetching = sum(game.word is None for game in engine.GAMES.values())
+        start = time.monotonic()
+        for channel in list(engine.GAMES):
+            engine.handle_mention("stahp", channel, None)
+        while not all(game.finished for game in engine.GAMES.values()):
+            time.sleep(0.001)
+        print(f"stahp: {len(engine.GAMES)} games stopped in {(time.monotonic() - start) * 1000:.0f} ms, {fetching} of them waiting for a word")
+    finally:
+        server.kill()
+
+
+def race():
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    backend = CountingBackend()
+    engine = EYFEngine(backend=backend)
+    engine.new_game("play 60 minutes 100000 points", "race")
+    game = engine.get_game("race")
+
+    failures = 0
+    for _ in range(RACE_ROUNDS):
+        while game.word is None:
+            time.sleep(0.01)
+        word = game.word
+        barrier = threading.Barrier(RACE_THREADS)
+
+        def answer(player_id):
+            barrier.wait()
+            for _ in range(RACE_ANSWERS):
+                game.handle_response(player_id, word)
+
+        threads = [threading.Thread(target=answer, args=(f"player-{i}",)) for i in range(RACE_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        while engine.get_outbound_stats()["depth"]:
+            time.sleep(0.01)
+        time.sleep(0.1)  # last post may still be in flight
+        winners = backend.winners[word]
+        failures += winners != 1
+        print(f"{word}: {RACE_THREADS * RACE_ANSWERS} answers, {winners} winner(s)")
+    print("OK" if not failures else f"FAILED: {failures} word(s) without exactly one winner")
+    os._exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    {"race": race, "standin": standin}.get(MODE, main)()
+    os._exit(0)  # games never end by themselves
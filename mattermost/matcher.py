@@ -0,0 +1,57 @@
+try:
+    from .wordlist import fold
+except ImportError:
+    from wordlist import fold
+
+CLOSE_DISTANCE = 2  # edits still worth a "très proche"
+LIGATURES = {"œ": "oe", "æ": "ae"}
+
+FOUND = "found"
+CLOSE = "close"
+
+
+def normalize(text):
+    """Fold `text` for comparison: lowercase, no accents, no ligatures, single spaces."""
+    if text.isascii():  # most chat messages, nothing to fold
+        text = text.lower()
+    else:
+        text = fold(text)
+        for ligature, letters in LIGATURES.items():
+            text = text.replace(ligature, letters)
+    return " ".join(text.split())
+
+
+class AnswerMatcher:
+    """Judges answers against one word, built once when the word is shown.
+
+    The word and its accepted variants are normalized up front, so an answer
+    costs one normalization, a length check and at most one edit distance
+    per target, bounded to CLOSE_DISTANCE.
+    """
+
+    def __init__(self, word, variants=()):
+        self.word = word
+        targets = {normalize(word)}
+        for variant in (word.replace("-", " "), word.replace("-", ""), *variants):
+            targets.add(normalize(variant))
+        self.targets = frozenset(targets)
+        self.min_length = min(len(target) for target in self.targets)
+        self.max_length = max(len(target) for target in self.targets)
+
+    def match(self, response):
+        """Return FOUND, CLOSE or None for a raw chat message."""
+        # decomposed accents take two characters until folded
+        if len(response) > 2 * (self.max_length + CLOSE_DISTANCE):
+            return None
+        response = normalize(response)
+        length = len(response)
+        if length < self.min_length - CLOSE_DISTANCE or length > self.max_length + CLOSE_DISTANCE:
+            return None
+        if response in self.targets:
+            return FOUND
+        from Levenshtein import distance
+        for target in self.targets:
+            if abs(len(target) - length) <= CLOSE_DISTANCE \
+                    and distance(response, target, score_cutoff=CLOSE_DISTANCE) <= CLOSE_DISTANCE:
+                return CLOSE
+        return None
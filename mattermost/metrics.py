@@ -0,0 +1,34 @@
+import collections
+import os
+import threading
+
+LATENCY_SAMPLES = int(os.getenv("EYF_LATENCY_SAMPLES", "10000"))
+
+
+class LatencyStats:
+    """Keeps the last `size` latency samples (in seconds) to report percentiles."""
+
+    def __init__(self, size=LATENCY_SAMPLES):
+        self.samples = collections.deque(maxlen=size)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def percentile(self, p):
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+    def summary(self):
+        p50, p99 = self.percentile(50), self.percentile(99)
+        return {
+            "count": self.count,
+            "p50_ms": None if p50 is None else round(p50 * 1000, 2),
+            "p99_ms": None if p99 is None else round(p99 * 1000, 2),
+        }
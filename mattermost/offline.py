@@ -0,0 +1,267 @@
+"""Offline definition store, pre-rendered from a wiktionary XML dump or the live API.
+
+    poetry run python offline.py french-full frwiktionary-latest-pages-articles.xml.bz2
+    poetry run python offline.py french-full --jobs 8  # fetches every word of the list
+
+Rendering is spread over a process pool. Once imported, `Wikidict` serves
+definitions from the store without any network access. Set EYF_OFFLINE=1 to
+never fall back to the live API.
+"""
+import argparse
+import bz2
+import os
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from loguru import logger
+try:
+    from .wikihttp import HTTP, MAX_TITLES_PER_QUERY
+except ImportError:
+    from wikihttp import HTTP, MAX_TITLES_PER_QUERY
+
+OFFLINE = os.getenv("EYF_OFFLINE", "").strip().lower() in {"1", "true", "yes", "on"}
+
+MISS = object()
+
+
+class DefinitionStore:
+    """Compact word -> definition store for one dictionary, backed by SQLite.
+
+    A NULL definition records a word whose page yielded no usable definition,
+    `reason` then tells why it was rejected.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self._db = None
+
+    def exists(self):
+        return self._db is not None or os.path.exists(self.path)
+
+    @property
+    def db(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS definitions ("
+                " word TEXT PRIMARY KEY,"
+                " definition TEXT,"
+                " reason TEXT"
+                ") WITHOUT ROWID"
+            )
+        return self._db
+
+    def get(self, word):
+        with self.lock:
+            row = self.db.execute("SELECT definition FROM definitions WHERE word = ?", (word,)).fetchone()
+        return MISS if row is None else row[0]
+
+    def put_many(self, rows):
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO definitions VALUES (?, ?, ?)", rows)
+            self.db.commit()
+
+    def playable(self):
+        """{word: whether it has a usable definition} for every stored word."""
+        with self.lock:
+            rows = self.db.execute("SELECT word, definition IS NOT NULL FROM definitions")
+            return {word: bool(usable) for word, usable in rows}
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM definitions").fetchone()[0]
+
+
+class DefinitionStoreRegistry:
+    """Process-wide registry of offline stores, one per dictionary tag, shared by every game."""
+
+    def __init__(self):
+        self.STORES = {}
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        with self.lock:
+            store = self.STORES.get(path)
+            if store is None:
+                store = self.STORES[path] = DefinitionStore(path)
+            return store
+
+
+STORES = DefinitionStoreRegistry()
+
+
+def iter_dump_pages(dump_file):
+    """Yield (title, wikitext) for every main namespace, non-redirect page of a dump.
+
+    Elements are dropped as soon as they are read, so memory stays constant
+    whatever the size of the dump.
+    """
+    opener = bz2.open if str(dump_file).endswith(".bz2") else open
+    with opener(dump_file, mode="rb") as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        title = ns = text = None
+        redirect = False
+        for event, elem in context:
+            if event != "end":
+                continue
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag == "title":
+                title = elem.text
+            elif tag == "ns":
+                ns = elem.text
+            elif tag == "redirect":
+                redirect = True
+            elif tag == "text":
+                text = elem.text
+            elif tag == "page":
+                if ns == "0" and not redirect and title and text:
+                    yield title, text
+                title = ns = text = None
+                redirect = False
+                root.clear()
+
+
+def iter_api_pages(wikidict):
+    """Yield (word, wikitext) for every word of the list, fetched from the live API."""
+    words = list(wikidict.WORDS)
+    step = MAX_TITLES_PER_QUERY * HTTP.concurrency
+    for i in range(0, len(words), step):
+        try:
+            pages = wikidict.fetch_wikitexts(words[i:i + step])
+        except Exception as e:
+            logger.warning(f"Couldn't fetch {words[i]}..{words[min(i + step, len(words)) - 1]}: {e}")
+            continue
+        for word, (_, wikitext) in pages.items():
+            if wikitext is not None:
+                yield word, wikitext
+
+
+_worker = None
+
+
+def _init_worker(wiki_slug, load_words):
+    global _worker
+    try:
+        from .wikidict import Wikidict
+    except ImportError:
+        from wikidict import Wikidict
+    _worker = Wikidict(wiki_slug, load_words=load_words)
+
+
+def _render_chunk(pages):
+    rendered = []
+    for word, wikitext in pages:
+        try:
+            definition, reason = _worker.render_definition(word, wikitext)
+        except Exception as e:
+            definition, reason = None, f"error: {e}"
+        rendered.append((word, definition, reason))
+    return rendered
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def render_pages(wiki_slug, pages, jobs, load_words=True, chunk_size=64):
+    """Render (word, wikitext) pairs over `jobs` processes, yielding (word, definition, reason).
+
+    Only a few chunks per process are in flight at once, so `pages` is
+    consumed lazily and memory stays bounded.
+    """
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(wiki_slug, load_words)) as pool:
+        pending = set()
+        for chunk in _chunks(pages, chunk_size):
+            pending.add(pool.submit(_render_chunk, chunk))
+            if len(pending) >= jobs * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in pending:
+            yield from future.result()
+
+
+def import_pages(wikidict, dump_file=None, jobs=None, batch_size=1000):
+    jobs = jobs or os.cpu_count() or 1
+    store = wikidict.offline_store
+    write_list = not os.path.exists(wikidict.list_file)
+    if write_list and dump_file is None:
+        raise ValueError("A dump file is needed when there is no word list yet")
+    if not write_list:
+        wikidict.load_list()
+
+    if dump_file is None:
+        pages = iter_api_pages(wikidict)
+    else:
+        pages = (
+            (title, wikitext)
+            for title, wikitext in iter_dump_pages(dump_file)
+            if (wikidict.is_playable_title(title) if write_list else title in wikidict.wordlist)
+        )
+
+    words = []
+    batch = []
+    rendered = imported = 0
+    rejections = {}
+    start = time.time()
+    for word, definition, reason in render_pages(wikidict.wiki_slug, pages, jobs, load_words=not write_list):
+        rendered += 1
+        if isinstance(definition, tuple):  # redirections are left to the live API
+            continue
+        if definition is None:
+            rejections[reason] = rejections.get(reason, 0) + 1
+            if write_list:
+                continue
+        else:
+            imported += 1
+            if write_list:
+                words.append(word)
+        batch.append((word, definition, reason))
+        if len(batch) >= batch_size:
+            store.put_many(batch)
+            batch = []
+            logger.info(f"{rendered} pages rendered, {imported} definitions imported ({rendered / (time.time() - start):.0f} words/s)")
+    store.put_many(batch)
+    if write_list:
+        wikidict.list_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(wikidict.list_file, mode="w", encoding="utf8") as f:
+            f.writelines(word + "\n" for word in words)
+    elapsed = time.time() - start
+    logger.info(
+        f"Done: {rendered} pages rendered in {elapsed:.1f}s on {jobs} processes ({rendered / max(elapsed, 1e-9):.0f} words/s), "
+        f"{imported} definitions imported into {store.path}, rejections: {rejections}"
+    )
+
+
+def main():
+    try:
+        from .wikidict import Wikidict
+    except ImportError:
+        from wikidict import Wikidict
+
+    parser = argparse.ArgumentParser(description="Pre-render definitions into the offline definition store")
+    parser.add_argument("dictionary", choices=list(Wikidict.WIKIS.keys()))
+    parser.add_argument("dump_file", nargs="?", help="path to a *-pages-articles.xml(.bz2) dump, the live API is used otherwise")
+    parser.add_argument("--jobs", type=int, default=None, help="rendering processes, defaults to the number of cores")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(lambda msg: print(msg, end=""), level="INFO")
+    import_pages(Wikidict(args.dictionary, load_words=False), args.dump_file, jobs=args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import collections
+import os
+import threading
+import time
+
+from loguru import logger
+
+try:
+    from .scheduler import Scheduler
+    from .metrics import LatencyStats
+except ImportError:
+    from scheduler import Scheduler
+    from metrics import LatencyStats
+
+OUTBOUND_WORKERS = int(os.getenv("EYF_OUTBOUND_WORKERS", "4"))
+POST_INTERVAL = float(os.getenv("EYF_POST_INTERVAL", "0.5"))  # seconds between two posts in a channel
+MAX_POST_LENGTH = 16383  # Mattermost limit
+GENERAL = "general"  # queue of post_general, when the backend does not tell its channel
+
+
+class Post:
+    def __init__(self, send, target, text, mergeable=True):
+        self.send = send  # send(target, text)
+        self.target = target  # channel id or message replied to
+        self.text = text
+        self.mergeable = mergeable
+        self.queued_at = time.monotonic()
+
+    def can_merge(self, other):
+        return self.mergeable and other.mergeable and self.send == other.send and self.target == other.target
+
+
+class ChannelQueue:
+    def __init__(self):
+        self.pending = collections.deque()
+        self.scheduled = False
+        self.last_sent = 0
+
+
+class OutboundDispatcher:
+    """Queues the posts of the engine and sends them asynchronously.
+
+    Each channel has its own queue, sent in order and at most one post every
+    `interval` seconds; posts queued meanwhile are merged into a single post,
+    so a burst costs one API call. Sending runs on a bounded pool of its own,
+    game timers never wait on the chat server.
+
+    A backend whose `post_general` posts in a channel games also play in tells
+    it through `main_channel_id`, so that general posts share the queue, order
+    and rate limit of that channel.
+    """
+
+    def __init__(self, backend, interval=POST_INTERVAL, workers=OUTBOUND_WORKERS):
+        self.backend = backend
+        self.interval = interval
+        self.scheduler = Scheduler(workers)
+        self.channels = {}
+        self.lock = threading.Lock()
+        self.depth = 0
+        self.sent = 0
+        self.latency = LatencyStats()  # from queueing to sent
+
+    # Same contract as the backend
+
+    def reply_to(self, _message, text):
+        self._queue(getattr(_message, "channel_id", GENERAL), Post(self.backend.reply_to, _message, text, mergeable=False))
+
+    def post_general(self, text):
+        key = getattr(self.backend, "main_channel_id", None) or GENERAL
+        self._queue(key, Post(self._post_general, None, text))
+
+    def _post_general(self, _target, text):
+        self.backend.post_general(text)
+
+    def post_in(self, channel_id, text):
+        self._queue(channel_id, Post(self.backend.post_in, channel_id, text))
+
+    def _queue(self, key, post):
+        with self.lock:
+            channel = self.channels.setdefault(key, ChannelQueue())
+            channel.pending.append(post)
+            self.depth += 1
+            if channel.scheduled:
+                return
+            channel.scheduled = True
+            delay = max(0, channel.last_sent + self.interval - time.monotonic())
+        self.scheduler.call_later(delay, self._send_next, key)
+
+    def _send_next(self, key):
+        with self.lock:
+            channel = self.channels[key]
+            batch = [channel.pending.popleft()]
+            length = len(batch[0].text)
+            while channel.pending and batch[0].can_merge(channel.pending[0]) \
+                    and length + 1 + len(channel.pending[0].text) <= MAX_POST_LENGTH:
+                batch.append(channel.pending.popleft())
+                length += 1 + len(batch[-1].text)
+            self.depth -= len(batch)
+        try:
+            batch[0].send(batch[0].target, "\n".join(post.text for post in batch))
+        except Exception as e:
+            logger.error(f"Couldn't send post to {key}: {e}")
+        now = time.monotonic()
+        for post in batch:
+            self.latency.record(now - post.queued_at)
+        with self.lock:
+            self.sent += 1
+            channel.last_sent = now
+            if not channel.pending:
+                channel.scheduled = False
+                return
+        self.scheduler.call_later(self.interval, self._send_next, key)
+
+    def stats(self):
+        return {**self.latency.summary(), "depth": self.depth, "sent": self.sent}
@@ -0,0 +1,75 @@
+import os
+import queue
+import threading
+import time
+
+from loguru import logger
+
+PREFETCH_DEPTH = int(os.getenv("EYF_PREFETCH_DEPTH", "3"))
+PREFETCH_BATCH = int(os.getenv("EYF_PREFETCH_BATCH", "20"))  # candidate words fetched per request
+
+
+class WordPrefetcher:
+    """Keeps up to `depth` validated (word, definition) pairs ready for one dictionary.
+
+    A daemon thread fetches candidate words in batches and keeps the playable
+    ones, so that games draw their next word from the queue in constant time.
+    """
+
+    def __init__(self, wikidict, depth=PREFETCH_DEPTH):
+        self.wikidict = wikidict
+        self.queue = queue.Queue(maxsize=depth)
+        self.hits = 0
+        self.misses = 0
+        self.thread = threading.Thread(target=self._fill, name=f"prefetch-{wikidict.prefetch_key}", daemon=True)
+        self.thread.start()
+
+    def _fill(self):
+        while True:
+            pairs = []
+            try:
+                pairs = self.wikidict.pick_words_and_definitions(PREFETCH_BATCH)
+            except Exception as e:
+                logger.warning(f"Prefetcher for {self.wikidict.wiki_slug} failed: {e}")
+            if not pairs:
+                time.sleep(1)  # wiktionary is likely down, don't hammer it
+            for pair in pairs:
+                self.queue.put(pair)
+
+    def take(self):
+        while True:
+            try:
+                word, definition = self.queue.get_nowait()
+            except queue.Empty:
+                self.misses += 1
+                return self.wikidict.pick_word_and_definition()
+            if word in self.wikidict.wordlist:  # may have been excluded while waiting
+                self.hits += 1
+                return word, definition
+
+    def stats(self):
+        return {"depth": self.queue.qsize(), "hits": self.hits, "misses": self.misses}
+
+
+class PrefetcherRegistry:
+    """One prefetcher per `Wikidict.WIKIS` slug and difficulty, shared by the games using it."""
+
+    def __init__(self):
+        self.PREFETCHERS = {}
+        self.lock = threading.Lock()
+
+    def start(self, wikidict):
+        if PREFETCH_DEPTH <= 0:
+            return None
+        with self.lock:
+            prefetcher = self.PREFETCHERS.get(wikidict.prefetch_key)
+            if prefetcher is None:
+                prefetcher = WordPrefetcher(wikidict)
+                self.PREFETCHERS[wikidict.prefetch_key] = prefetcher
+            return prefetcher
+
+    def get(self, prefetch_key):
+        return self.PREFETCHERS.get(prefetch_key)
+
+
+PREFETCHERS = PrefetcherRegistry()
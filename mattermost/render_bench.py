@@ -0,0 +1,225 @@
+"""Measures how fast definitions are rendered, and checks that the output does not change.
+
+    poetry run python render_bench.py
+    poetry run python render_bench.py golden
+    poetry run python render_bench.py golden update
+    poetry run python render_bench.py dedup
+    poetry run python render_bench.py ranking
+
+Renders every line of corpus/definition_lines.txt with `render_wikitext`,
+RENDER_BENCH_ROUNDS times (default 200), and reports the median throughput
+over RENDER_BENCH_RUNS runs (default 5). No network involved.
+
+`golden` renders those lines and the pages of corpus/pages.json, and checks
+that the output is byte-identical to corpus/golden.json. Pages are shuffled
+by `render_definition`, so the random generator is seeded before each one.
+`golden update` rewrites corpus/golden.json; it was produced by the renderer
+preceding the single-pass one (ba16fe2), itself identical to the original.
+
+`dedup` checks `remove_similar_sentences` against the original quadratic
+version kept below: the definitions of every corpus page, DEDUP_PAGES
+(default 20) synthetic pages of DEDUP_PAGE_SIZE (default 112) sentences with
+near-duplicates, as large as the largest wiktionary pages, and
+DEDUP_SMALL_SETS (default 3000) small random sets must give the same result.
+Reports the time per synthetic page of both versions.
+
+`ranking` times `sort_sentences_by_coherence`, the ranking each
+`get_definition` call does, on the definitions of every corpus page against
+the french-full word list, and compares it with the original scan of the
+word list as a Python list. Both must rank the definitions the same way.
+
+Only the public rendering methods are used, so that the script also runs
+against older revisions, to compare them:
+
+    git worktree add /tmp/eyf-before <revision>
+    cp -r render_bench.py corpus /tmp/eyf-before/mattermost/
+    (cd /tmp/eyf-before/mattermost && poetry run python render_bench.py)
+"""
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+from loguru import logger
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+WORDS_FILE = CORPUS_DIR.parent / "data" / "wikidict.simple.fr.txt"  # vocabulary of the synthetic pages
+ROUNDS = int(os.getenv("RENDER_BENCH_ROUNDS", "200"))
+RUNS = int(os.getenv("RENDER_BENCH_RUNS", "5"))
+DEDUP_PAGES = int(os.getenv("DEDUP_PAGES", "20"))
+DEDUP_PAGE_SIZE = int(os.getenv("DEDUP_PAGE_SIZE", "112"))
+DEDUP_SMALL_SETS = int(os.getenv("DEDUP_SMALL_SETS", "3000"))
+
+
+def load_lines():
+    with open(CORPUS_DIR / "definition_lines.txt", mode="r", encoding="utf8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def load_pages():
+    with open(CORPUS_DIR / "pages.json", mode="r", encoding="utf8") as f:
+        return json.load(f)
+
+
+def render_corpus(wikidict):
+    lines = [wikidict.render_wikitext(line) for line in load_lines()]
+    pages = []
+    for i, page in enumerate(load_pages()):
+        random.seed(i)
+        # through json, so that a redirection compares equal to the stored one
+        pages.append(json.loads(json.dumps(wikidict.definition_from_wikitext(page["word"], page["wikitext"]))))
+    return {"lines": lines, "pages": pages}
+
+
+def golden(wikidict, update=False):
+    rendered = render_corpus(wikidict)
+    path = CORPUS_DIR / "golden.json"
+    if update:
+        with open(path, mode="w", encoding="utf8") as f:
+            json.dump(rendered, f, ensure_ascii=False, indent=1)
+        print(f"wrote {path}")
+        return True
+    with open(path, mode="r", encoding="utf8") as f:
+        expected = json.load(f)
+    failures = 0
+    for kind in ("lines", "pages"):
+        for i, (got, wanted) in enumerate(zip(rendered[kind], expected[kind])):
+            if got != wanted:
+                failures += 1
+                print(f"{kind}[{i}] differs:\n  expected {wanted!r}\n  got      {got!r}")
+        print(f"{kind}: {len(rendered[kind])} rendered, {len(expected[kind])} expected")
+        failures += len(rendered[kind]) != len(expected[kind])
+    print("OK" if not failures else f"FAILED: {failures} difference(s)")
+    return not failures
+
+
+def remove_similar_sentences_quadratic(sentences):
+    """remove_similar_sentences as it was, comparing each sentence to every kept one."""
+    from fuzzywuzzy import fuzz
+    unique_sentences = []
+    for sentence in sentences:
+        if not any(fuzz.ratio(sentence, unique_sentence) >= 80 for unique_sentence in unique_sentences):
+            unique_sentences.append(sentence)
+    return unique_sentences
+
+
+def synthetic_page(rng, vocabulary, size):
+    """Sentences of random words, a third of them a slightly edited copy of an earlier one."""
+    sentences = []
+    while len(sentences) < size:
+        if sentences and rng.random() < 0.3:
+            words = rng.choice(sentences).split()
+            for _ in range(rng.randint(1, 2)):
+                i = rng.randrange(len(words))
+                if rng.random() < 0.5:
+                    words[i] = rng.choice(vocabulary)
+                else:
+                    words[i] = words[i][:-1] or words[i]
+            sentences.append(" ".join(words))
+        else:
+            sentences.append(" ".join(rng.choice(vocabulary) for _ in range(rng.randint(3, 16))))
+    return sentences
+
+
+def dedup(wikidict):
+    rng = random.Random(0)
+    with open(WORDS_FILE, mode="r", encoding="utf8") as f:
+        vocabulary = [word.strip() for word in f if word.strip()]
+    corpus_pages = []
+    for page in load_pages():
+        lines = [line for line in page["wikitext"].split("\n") if len(line) > 2 and line[0] == "#" and line[1] != "*"]
+        corpus_pages.append(wikidict.remove_duplicates([wikidict.render_wikitext(line) for line in lines]))
+    large_pages = [synthetic_page(rng, vocabulary, DEDUP_PAGE_SIZE) for _ in range(DEDUP_PAGES)]
+    small_sets = [synthetic_page(rng, vocabulary, rng.randint(1, 12)) for _ in range(DEDUP_SMALL_SETS)]
+
+    failures = 0
+    for name, pages in (("corpus pages", corpus_pages), ("synthetic pages", large_pages), ("small sets", small_sets)):
+        different = sum(wikidict.remove_similar_sentences(page) != remove_similar_sentences_quadratic(page) for page in pages)
+        print(f"{name}: {len(pages)} checked, {different} different")
+        failures += different
+
+    for name, remove in (("quadratic", remove_similar_sentences_quadratic), ("current", wikidict.remove_similar_sentences)):
+        times = []
+        for page in large_pages:
+            start = time.perf_counter()
+            remove(page)
+            times.append(time.perf_counter() - start)
+        print(f"{name}: {statistics.mean(times) * 1000:.1f} ms per {DEDUP_PAGE_SIZE}-sentence page, {max(times) * 1000:.1f} ms at most")
+    print("OK" if not failures else f"FAILED: {failures} page(s) deduplicated differently")
+    return not failures
+
+
+def ranking():
+    from wikidict import Wikidict
+    wikidict = Wikidict("french-full")
+    wikidict.load_list()
+    words = list(wikidict.wordlist)  # the vocabulary as the original code held it
+
+    def score_sentence_scan(sentence):
+        words_in_sentence = sentence.split()
+        if not words_in_sentence:
+            return 0
+        special_char_count = sum(1 for c in sentence if c in string.punctuation)
+        valid_word_count = sum(1 for word in words_in_sentence if word.lower() in words)
+        return valid_word_count - special_char_count + len(words_in_sentence)
+
+    pages = [
+        wikidict.remove_duplicates([wikidict.render_wikitext(line) for line in page["wikitext"].split("\n") if len(line) > 2 and line[0] == "#" and line[1] != "*"])
+        for page in load_pages()
+    ]
+    tokens = sum(len(sentence.split()) for page in pages for sentence in page)
+    distinct = len({word.lower() for page in pages for sentence in page for word in sentence.split()})
+    print(f"{len(pages)} pages, {tokens} words, {distinct} distinct")
+
+    # known words are remembered by the word list, the first pass starts with none
+    for name, rank in (
+        ("list scan", lambda page: sorted(page, key=score_sentence_scan, reverse=True)),
+        ("current, first pass", wikidict.sort_sentences_by_coherence),
+        ("current, second pass", wikidict.sort_sentences_by_coherence),
+    ):
+        start = time.perf_counter()
+        for page in pages:
+            rank(page)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {elapsed / len(pages) * 1e6:.0f} µs per get_definition, {elapsed / tokens * 1e6:.2f} µs per word")
+
+    different = sum(
+        wikidict.sort_sentences_by_coherence(page) != sorted(page, key=score_sentence_scan, reverse=True)
+        for page in pages
+    )
+    print("OK" if not different else f"FAILED: {different} page(s) ranked differently")
+    return not different
+
+
+def throughput(wikidict):
+    lines = load_lines()
+    rates = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            for line in lines:
+                wikidict.render_wikitext(line)
+        rates.append(len(lines) * ROUNDS / (time.perf_counter() - start))
+    print(f"render_wikitext: {statistics.median(rates):.0f} lines/s ({len(lines)} lines)")
+
+
+def main():
+    logger.remove()  # debug logging would dominate the timings
+    logger.add(sys.stderr, level="ERROR")
+    if sys.argv[1:2] == ["ranking"]:
+        sys.exit(0 if ranking() else 1)
+    from wikidict import Wikidict
+    wikidict = Wikidict("french-simple")
+    if sys.argv[1:2] == ["golden"]:
+        sys.exit(0 if golden(wikidict, update=sys.argv[2:] == ["update"]) else 1)
+    if sys.argv[1:2] == ["dedup"]:
+        sys.exit(0 if dedup(wikidict) else 1)
+    throughput(wikidict)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+SCHEDULER_WORKERS = int(os.getenv("EYF_SCHEDULER_WORKERS", "8"))
+
+
+class TimerHandle:
+    def __init__(self, when, callback, args):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """Drives every timed game event from a single timer thread.
+
+    Due callbacks are handed to a bounded pool of workers, so the number of
+    threads does not depend on the number of running games. Callbacks must not
+    block on I/O, or every game waits for them: fetching words and writing to
+    disk have their own pools, see `EYFEngine`.
+    """
+
+    def __init__(self, workers=SCHEDULER_WORKERS):
+        self.heap = []
+        self.counter = itertools.count()  # tie-breaker, callbacks are not comparable
+        self.condition = threading.Condition()
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="eyf-worker")
+        self.thread = threading.Thread(target=self._run, name="eyf-scheduler", daemon=True)
+        self.thread.start()
+
+    def call_later(self, delay, callback, *args):
+        handle = TimerHandle(time.monotonic() + delay, callback, args)
+        with self.condition:
+            heapq.heappush(self.heap, (handle.when, next(self.counter), handle))
+            self.condition.notify()
+        return handle
+
+    def call_soon(self, callback, *args):
+        return self.call_later(0, callback, *args)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.heap:
+                    self.condition.wait()
+                when, _, handle = self.heap[0]
+                delay = when - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                heapq.heappop(self.heap)
+            if not handle.cancelled:
+                self.pool.submit(self._call, handle)
+
+    @staticmethod
+    def _call(handle):
+        try:
+            handle.callback(*handle.args)
+        except Exception as e:
+            logger.exception(f"Scheduled {handle.callback} failed: {e}")
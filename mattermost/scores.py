@@ -1,24 +1,124 @@
 import json
+import os
+import sqlite3
+import threading
+import time
 from pathlib import Path
 
-GLOBAL_SCORES = {}
+from loguru import logger
+try:
+    from .leaderboard import Leaderboard, ScoreWindow, period_of, window_start
+except ImportError:
+    from leaderboard import Leaderboard, ScoreWindow, period_of, window_start
+
 MODULE_DIR = Path(__file__).resolve().parent
-SCORES_FILE = MODULE_DIR / "data" / "high_scores.json"
+SCORES_FILE = MODULE_DIR / "data" / "high_scores.json"  # legacy store, migrated on first start
+SCORES_DB = Path(os.getenv("EYF_SCORES_FILE", MODULE_DIR / "data" / "scores.sqlite3"))
+LEADERBOARD_PAGE_SIZE = int(os.getenv("EYF_LEADERBOARD_PAGE_SIZE", "20"))
+EVERYWHERE = "*"  # scope of the cross-channel scores
 
 class ScoreHandler():
-    def __init__(self):
+    """Per channel and player scores, kept in memory and persisted in SQLite.
+
+    The database is in WAL mode: finishing a game appends the rows of its
+    players in one transaction, so it costs the same whatever the history,
+    and a crash can never leave a half-written store behind.
+
+    Every game result is also recorded in `results`, and added to the day,
+    week and all-time `WINDOWS` of its channel and of every channel, so that
+    these leaderboards are read without going through past games. Only the
+    results of the current week are read back on start.
+    """
+
+    def __init__(self, path=SCORES_DB):
         self.GLOBAL_SCORES = {}
-        self.GLOBAL_SCORES.clear()
-        if not SCORES_FILE.exists():
-            return
+        self.lock = threading.Lock()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " channel TEXT NOT NULL,"
+            " player TEXT NOT NULL,"
+            " total_points INTEGER NOT NULL,"
+            " games_played INTEGER NOT NULL,"
+            " win_rate REAL NOT NULL,"
+            " PRIMARY KEY (channel, player)) WITHOUT ROWID"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " finished_at REAL NOT NULL,"
+            " channel TEXT NOT NULL,"
+            " player TEXT NOT NULL,"
+            " points INTEGER NOT NULL,"
+            " performance REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_finished_at ON results (finished_at)")
+        for channel, player, total_points, games_played, win_rate in self.db.execute("SELECT * FROM scores"):
+            self.GLOBAL_SCORES.setdefault(channel, {})[player] = {
+                "total_points": total_points, "games_played": games_played, "win_rate": win_rate
+            }
+        if not self.GLOBAL_SCORES and SCORES_FILE.exists():
+            self._migrate_json()
+        self.LEADERBOARDS = {channel: Leaderboard(players) for channel, players in self.GLOBAL_SCORES.items()}
+        self._load_windows()
+
+    def _load_windows(self):
+        self.WINDOWS = {}  # (window, channel or EVERYWHERE) -> ScoreWindow
+        now = time.time()
+        everywhere = self._window("all", EVERYWHERE, now)
+        for players in self.GLOBAL_SCORES.values():
+            for player, score in players.items():
+                everywhere.add(player, score["total_points"], score["win_rate"] * score["games_played"], score["games_played"])
+        rows = self.db.execute(
+            "SELECT finished_at, channel, player, points, performance FROM results WHERE finished_at >= ?",
+            (window_start("week", now),),
+        )
+        for finished_at, channel, player, points, performance in rows:
+            for window in ("day", "week"):
+                if period_of(window, finished_at) == period_of(window, now):
+                    self._window(window, channel, now).add(player, points, performance)
+                    self._window(window, EVERYWHERE, now).add(player, points, performance)
+
+    def _window(self, window, scope, now):
+        """Current ScoreWindow of `scope`, a new one if the period changed since the last game."""
+        period = period_of(window, now)
+        score_window = self.WINDOWS.get((window, scope))
+        if score_window is None or score_window.period != period:
+            score_window = self.WINDOWS[(window, scope)] = ScoreWindow(period)
+        return score_window
+
+    def _migrate_json(self):
         with open(SCORES_FILE, mode="r", encoding="utf-8") as f:
             self.GLOBAL_SCORES = json.load(f)
-        print(self.GLOBAL_SCORES)
+        logger.info(f"Migrating {SCORES_FILE} to {self.path}")
+        with self.db:
+            for channel, players in self.GLOBAL_SCORES.items():
+                self.save(channel, players)
+        SCORES_FILE.rename(SCORES_FILE.with_suffix(".json.migrated"))
 
-    def save(self):
-        SCORES_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(SCORES_FILE, mode="w", encoding="utf-8") as f:
-            json.dump(self.GLOBAL_SCORES, f, ensure_ascii=False, indent=2)
+    def save(self, channel, players):
+        self.db.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+            [
+                (channel, player, score["total_points"], score["games_played"], score["win_rate"])
+                for player, score in players.items()
+            ],
+        )
+
+    def record(self, channel, game_scores, max_score, now):
+        for player, points in game_scores.items():
+            performance = points / max_score
+            for window in ("day", "week"):
+                self._window(window, channel, now).add(player, points, performance)
+                self._window(window, EVERYWHERE, now).add(player, points, performance)
+            self._window("all", EVERYWHERE, now).add(player, points, performance)
+        self.db.executemany(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?)",
+            [(now, channel, player, points, points / max_score) for player, points in game_scores.items()],
+        )
 
     def update(self, channel, game_scores): # channel is a unique str id, game_score is dict player_id (int) -> score (int)
         # find maximum score, this player will get 1 point added to its win rate
@@ -27,35 +127,59 @@ class ScoreHandler():
         max_score = max(game_scores.values())
         if max_score <= 0:
             return
-        print("max score is", max_score)
-
-        self.GLOBAL_SCORES.setdefault(channel, {})
-        clean_game_scores = {}
-        for k, v in game_scores.items():
-            clean_game_scores[str(k)] = v
-        game_scores = clean_game_scores
-        for player in game_scores:
-            player = str(player)
-            game_performance = game_scores[player]/max_score # 1 for the best player, proportionaly less for the others, always in [0,1]
-
-            self.GLOBAL_SCORES[channel].setdefault(player, {"total_points": 0, "games_played": 0, "win_rate": 0})
-            self.GLOBAL_SCORES[channel][player]["total_points"] += game_scores[player]
-            self.GLOBAL_SCORES[channel][player]["games_played"] += 1
-            self.GLOBAL_SCORES[channel][player]["win_rate"] = (self.GLOBAL_SCORES[channel][player]["win_rate"]*(self.GLOBAL_SCORES[channel][player]["games_played"]-1) + game_performance)/self.GLOBAL_SCORES[channel][player]["games_played"]
-        self.save()
-
-    def get_scores(self, channel):
-        scores = self.GLOBAL_SCORES.get(channel)
-        if not scores:
-            return None
+        logger.debug(f"max score is {max_score}")
+
+        with self.lock:
+            self.GLOBAL_SCORES.setdefault(channel, {})
+            clean_game_scores = {}
+            for k, v in game_scores.items():
+                clean_game_scores[str(k)] = v
+            game_scores = clean_game_scores
+            for player in game_scores:
+                player = str(player)
+                game_performance = game_scores[player]/max_score # 1 for the best player, proportionaly less for the others, always in [0,1]
 
-        print(scores)
+                self.GLOBAL_SCORES[channel].setdefault(player, {"total_points": 0, "games_played": 0, "win_rate": 0})
+                self.GLOBAL_SCORES[channel][player]["total_points"] += game_scores[player]
+                self.GLOBAL_SCORES[channel][player]["games_played"] += 1
+                self.GLOBAL_SCORES[channel][player]["win_rate"] = (self.GLOBAL_SCORES[channel][player]["win_rate"]*(self.GLOBAL_SCORES[channel][player]["games_played"]-1) + game_performance)/self.GLOBAL_SCORES[channel][player]["games_played"]
+                self.LEADERBOARDS.setdefault(channel, Leaderboard()).update(player, self.GLOBAL_SCORES[channel][player]["win_rate"])
+            with self.db:
+                self.save(channel, {player: self.GLOBAL_SCORES[channel][player] for player in game_scores})
+                self.record(channel, game_scores, max_score, time.time())
 
-        sorted_keys = sorted(scores.keys(), key=lambda k: scores[k]["win_rate"], reverse=True)
-        print(sorted_keys)
+    def get_scores(self, channel, page=1, page_size=LEADERBOARD_PAGE_SIZE, window="all", everywhere=False):
+        """One page of the leaderboard of `channel`, or of every channel, for a window of WINDOWS.
+
+        None when nobody scored in that window, or when the page is past the end.
+        """
+        with self.lock:
+            leaderboard, score_of = self._leaderboard(channel, window, everywhere)
+            if not leaderboard:
+                return None
+            scores = {player: score_of(player) for player in leaderboard.page(page, page_size)}
+        if not scores:
+            return None
+        start = (page - 1) * page_size
         return "\n".join(
             [
-                f'<@{player}> : {scores[player]["total_points"]} ({scores[player]["games_played"]} partie{"s" if scores[player]["games_played"] > 1 else ""} : {round(scores[player]["win_rate"]*100,1)} % de victoire)'
-                for player in sorted_keys
+                f'{start + i + 1}. <@{player}> : {scores[player]["total_points"]} ({scores[player]["games_played"]} partie{"s" if scores[player]["games_played"] > 1 else ""} : {round(scores[player]["win_rate"]*100,1)} % de victoire)'
+                for i, player in enumerate(scores)
             ]
         )
+
+    def get_rank(self, channel, player, window="all", everywhere=False):
+        """(rank, number of ranked players) of `player` in a leaderboard, None if they are not in it."""
+        with self.lock:
+            leaderboard, _ = self._leaderboard(channel, window, everywhere)
+            rank = leaderboard.rank(str(player)) if leaderboard else None
+            return None if rank is None else (rank, len(leaderboard))
+
+    def _leaderboard(self, channel, window, everywhere):
+        """(Leaderboard, player -> score) of a window, (None, None) if nobody scored in it."""
+        if window == "all" and not everywhere:
+            return self.LEADERBOARDS.get(channel), self.GLOBAL_SCORES.get(channel, {}).get
+        score_window = self.WINDOWS.get((window, EVERYWHERE if everywhere else channel))
+        if score_window is None or score_window.period != period_of(window, time.time()):
+            return None, None
+        return score_window.leaderboard, score_window.score
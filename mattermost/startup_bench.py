@@ -0,0 +1,57 @@
+"""Measures how long the bot takes to be ready to play, from a fresh interpreter.
+
+    poetry run python startup_bench.py
+
+Each run imports the engine and starts it against a backend that does
+nothing, in a new process. Reports the median import time, time-to-ready and
+process wall time over STARTUP_BENCH_RUNS runs (default 10).
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = int(os.getenv("STARTUP_BENCH_RUNS", "10"))
+
+CHILD = """
+import time
+start = time.perf_counter()
+from engine import EYFEngine
+imported = time.perf_counter()
+
+class NullBackend:
+    def reply_to(self, _message, text):
+        pass
+
+    def post_general(self, text):
+        pass
+
+    def post_in(self, channel_id, text):
+        pass
+
+EYFEngine(backend=NullBackend()).start()
+ready = time.perf_counter()
+print(imported - start, ready - start)
+"""
+
+
+def main():
+    imports, readies, walls = [], [], []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+        walls.append(time.perf_counter() - started)
+        imported, ready = map(float, output.split()[-2:])
+        imports.append(imported)
+        readies.append(ready)
+    print(f"import engine: {statistics.median(imports) * 1000:.0f} ms")
+    print(f"time to ready: {statistics.median(readies) * 1000:.0f} ms")
+    print(f"process wall time: {statistics.median(walls) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
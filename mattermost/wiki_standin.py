@@ -0,0 +1,100 @@
+"""Local stand-in for the wiktionary API, to measure the bot without hitting wiktionary.
+
+    poetry run python wiki_standin.py --port 8900 --latency 0.05
+    EYF_WIKI_API_URL=http://localhost:8900/w/api.php poetry run python eyf.py
+
+Serves the `categorymembers`, `parse` and `revisions` queries the bot uses,
+with a synthetic page for every word of the chosen word list.
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+MODULE_DIR = Path(__file__).resolve().parent
+
+
+def fake_wikitext(word, i):
+    return (
+        "== {{langue|fr}} ==\n"
+        "=== {{S|nom|fr}} ===\n"
+        f"# Définition de test numéro {i}, avec un [[lien|petit lien]].\n"
+        f"# {{{{term|Exemple}}}} Autre sens du numéro {i}, pour vérifier le rendu des modèles.\n"
+    )
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like wiktionary
+    disable_nagle_algorithm = True
+    words = []
+    positions = {}
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if params.get("action") == "parse":
+            data = self.parse(params["page"])
+        elif params.get("list") == "categorymembers":
+            data = self.categorymembers(params)
+        elif params.get("prop") == "revisions":
+            data = self.revisions(params["titles"].split("|"))
+        else:
+            data = {"error": {"code": "badquery"}}
+        body = json.dumps(data).encode("utf8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def parse(self, page):
+        i = self.positions.get(page)
+        if i is None:
+            return {"error": {"code": "missingtitle"}}
+        return {"parse": {"title": page, "wikitext": {"*": fake_wikitext(page, i)}}}
+
+    def categorymembers(self, params):
+        start = int(params.get("cmcontinue", 0))
+        end = start + int(params.get("cmlimit", 500))
+        data = {"query": {"categorymembers": [{"title": word} for word in self.words[start:end]]}}
+        if end < len(self.words):
+            data["continue"] = {"cmcontinue": str(end)}
+        return data
+
+    def revisions(self, titles):
+        pages = []
+        for title in titles:
+            i = self.positions.get(title)
+            if i is None:
+                pages.append({"title": title, "missing": True})
+            else:
+                pages.append({"title": title, "revisions": [{"slots": {"main": {"content": fake_wikitext(title, i)}}}]})
+        return {"batchcomplete": True, "query": {"pages": pages}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake wiktionary API")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every answer")
+    parser.add_argument("--list", default=str(MODULE_DIR / "data" / "wikidict.simple.fr.txt"))
+    args = parser.parse_args()
+
+    with open(args.list, mode="r", encoding="utf8") as f:
+        StandinHandler.words = [word.strip() for word in f if word.strip()]
+    StandinHandler.positions = {word: i for i, word in enumerate(StandinHandler.words)}
+    StandinHandler.latency = args.latency
+
+    server = ThreadingHTTPServer(("", args.port), StandinHandler)
+    print(f"Serving {len(StandinHandler.words)} words on http://localhost:{args.port}/w/api.php")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,107 @@
-from typing import List, Tuple, Optional
+import bisect
 import re
 import html
-import requests
 import random
 import os
 import math
 from pathlib import Path
-import wikitextparser as wtp
 from loguru import logger
-import time
 import string
-from fuzzywuzzy import fuzz
+try:
+    from .wordlist import WORDLISTS
+    from .definition_cache import DEFINITIONS
+    from .prefetch import PREFETCHERS
+    from .features import INDEXES, DIFFICULTIES
+    from .offline import STORES, OFFLINE, MISS as OFFLINE_MISS
+    from .wikihttp import HTTP, MAX_TITLES_PER_QUERY
+except ImportError:
+    from wordlist import WORDLISTS
+    from definition_cache import DEFINITIONS
+    from prefetch import PREFETCHERS
+    from features import INDEXES, DIFFICULTIES
+    from offline import STORES, OFFLINE, MISS as OFFLINE_MISS
+    from wikihttp import HTTP, MAX_TITLES_PER_QUERY
 
 VOWELS = "aeiouy"
 CONSONANTS = "bcdfghjklmnpqrstvwz"
 
+SIMILARITY_THRESHOLD = 80  # fuzz.ratio above which two definitions are the same
+# fuzz.ratio rounds, so 79.5 already counts as 80; lengths a <= b can only be that similar
+# when 2a / (a + b) >= 0.795, i.e. a / b >= 0.66, loosened a bit to stay on the safe side
+SIMILAR_LENGTH_RATIO = 0.65
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+REF_PATTERN = re.compile(r"<ref>.*?</ref>", re.DOTALL)
+MARKUP_PATTERN = re.compile(r'(\{\{.*?\}\}|\[\[.*?\]\])', re.DOTALL)
+LINK_CHUNK_PATTERN = re.compile(r"\[\[.*\]\]")
+TEMPLATE_CHUNK_PATTERN = re.compile(r"\{\{.*\}\}")
+TITLE_EDGES_PATTERN = re.compile(r"^\w.*\w$")
+TITLE_START_PATTERN = re.compile(r"^[a-zA-Z].*")
+
+
+def has_markup_brackets(text):
+    return "[[" in text or "]]" in text or "{{" in text or "}}" in text
+
+
+class RenderRules:
+    """Compiled avoid-regex patterns and template handlers of one `Wikidict.WIKIS` entry.
+
+    Built once per dictionary and shared by all its `Wikidict` instances.
+    Handlers take the template name and arguments and return the rendered
+    text, or None to drop the template.
+    """
+    CACHE = {}
+
+    def __init__(self, wiki_config):
+        self.lang = wiki_config["wiki_lang"]
+        self.avoid_patterns = [re.compile(regex) for regex in wiki_config.get("avoid-regex", [])]
+        self.template_handlers = {
+            "w": self._render_link_template,
+            "lien": self._render_link_template,
+            "lexique": self._render_link_template,
+            "info lex": self._render_link_template,
+            "term": self._render_link_template,
+            "lb": self._render_label_template,
+            "exemple": self._drop_template,
+            "exemple ": self._drop_template,
+        }
+
+    @classmethod
+    def get(cls, wiki_slug, wiki_config):
+        rules = cls.CACHE.get(wiki_slug)
+        if rules is None:
+            rules = cls.CACHE[wiki_slug] = cls(wiki_config)
+        return rules
+
+    def render_template(self, name, args):
+        if (args and args[0].value in ("fr", "1")) or (not args and len(name) > 3):
+            return f"({name.capitalize()})"
+        return self.template_handlers.get(name, self._render_other_template)(name, args)
+
+    def _render_link_template(self, name, args):
+        if not args:
+            return name
+        if name != "lexique" and str(args[-1])[-2:] == self.lang:
+            return str(args[0])[1:]
+        return "(" + str(args[0])[1:] + ")"
+
+    def _render_label_template(self, name, args):
+        if not args:
+            return name
+        return "(" + str(args[-1])[1:] + ")"
+
+    def _drop_template(self, name, args):
+        return None
+
+    def _render_other_template(self, name, args):
+        if args and name.startswith('variante') and name.endswith('de') and args[-1].value == self.lang:
+            return f"Variante de {args[0].value}"
+        return name
+
+    def is_to_avoid(self, definition):
+        definition_clean = definition.replace("*", "")
+        return any(pattern.match(definition_clean) for pattern in self.avoid_patterns)
+
 
 class Wikidict():
     WIKIS = {
@@ -54,21 +141,35 @@ class Wikidict():
             "description": "Nearly all english words",
         },
     }
-    WORDS = []
-    def __init__(self, wiki_slug="french-simple"):
+    def __init__(self, wiki_slug="french-simple", load_words=True, difficulty=None):
         wiki_config = self.WIKIS[wiki_slug]
         self.base_dir = Path(__file__).resolve().parent
         self.wiki_slug = wiki_slug
+        if difficulty is not None and difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty {difficulty}, expected one of {DIFFICULTIES}")
+        self.difficulty = difficulty
+        # games of a given difficulty need their own prefetched words
+        self.prefetch_key = wiki_slug if difficulty is None else f"{wiki_slug}:{difficulty}"
         self.lang = wiki_config["wiki_lang"]
         self.list_file = self.base_dir / "data" / f"wikidict.{wiki_config['tag']}.txt"
         self.exclude_file = self.base_dir / "data" / f"exclude.{wiki_config['tag']}.txt"
         self.bug_reports_file = self.base_dir / "data" / f"bugs.{wiki_config['tag']}.txt"
-        self.api_endpoint = f"https://{wiki_config['wiki_lang']}.wiktionary.org/w/api.php"
+        # shared between all games on this dictionary, like the word list
+        self.offline_store = STORES.get(self.base_dir / "data" / f"offline.{wiki_config['tag']}.sqlite3")
+        self.api_endpoint = HTTP.endpoint(wiki_config['wiki_lang'])
         self.category = wiki_config["wiki_category"]
         self.wiki_config = wiki_config
+        self.rules = RenderRules.get(wiki_slug, wiki_config)
         self.forced_words = self._load_forced_words()
-        self.load_list()
-        self.estimated = self.get_wordlist_len()
+        self.wordlist = None
+        self.estimated = 0
+        if load_words:
+            self.load_list()
+            self.estimated = self.get_wordlist_len()
+
+    @property
+    def WORDS(self):
+        return self.wordlist
 
     def _load_forced_words(self):
         raw_words = os.getenv("EYF_FORCED_WORDS", "").strip()
@@ -105,12 +206,20 @@ class Wikidict():
         pass
 
     def get_wordlist_len(self):
-        line_count = 0
-        with open(self.list_file, 'r', buffering=1) as f:
-            for line in f:
-                line_count += 1
-        return line_count
+        return len(self.wordlist)
+
 
+    @staticmethod
+    def is_playable_title(word):
+        return not (
+            len(word) < 3
+            or word[0].isupper()
+            or word[0].isdigit()
+            or word[-4:] == "ment"
+            or word.count(" ") > 2
+            or TITLE_EDGES_PATTERN.match(word) is None  # first and last char must be word letters
+            or TITLE_START_PATTERN.match(word) is None
+        )
 
     def create_list_file(self):
         logger.info("Loading words from API...")
@@ -130,23 +239,14 @@ class Wikidict():
                 start = False
                 if cont_key is not None:
                     params["cmcontinue"] = cont_key
-                response = requests.get(url=self.api_endpoint, params=params)
-                data = response.json()
+                data = HTTP.get_json(self.api_endpoint, params)
                 cont_key = None
                 if "continue" in data and "cmcontinue" in data["continue"]:
                     cont_key = data["continue"]["cmcontinue"]
                 if "query" in data and "categorymembers" in data["query"]:
                     for word in data["query"]["categorymembers"]:
                         word = word["title"]
-                        if not (
-                            len(word) < 3
-                            or word[0].isupper()
-                            or word[0].isdigit()
-                            or word[-4:] == "ment"
-                            or word.count(" ") > 2
-                            or re.match(r"^\w.*\w$", word) is None  # first and last char must be word letters
-                            or re.match(r"^[a-zA-Z].*", word) is None
-                        ):
+                        if self.is_playable_title(word):
                             f.write(word + "\n")
                             count += 1
                 self.estimated = count+500
@@ -176,31 +276,19 @@ class Wikidict():
 
 
     def exclude(self, word):
-        if word in self.WORDS:
-            self.WORDS.remove(word)
-        with open(self.exclude_file, mode="a", encoding="utf8") as f:
-            f.write(word + "\n")
+        WORDLISTS.exclude(self, word)
 
     def load_list(self):
-        if not os.path.exists(self.list_file):
-            self.create_list_file()
-        with open(self.list_file, mode="r", encoding="utf8") as f:
-            excluded_words = self.load_excluded()
-            self.WORDS = [
-                word.strip()
-                for word in f.readlines()
-                if len(word.strip()) > 0 and word.strip() not in excluded_words
-            ]
+        # shared between all games on this dictionary, see WordListRegistry
+        self.wordlist = WORDLISTS.get(self)
 
     def has_words(self, s):
-        pattern = re.compile(r'\b\w+\b')
-        if pattern.search(s):
+        if WORD_PATTERN.search(s):
             return True
         return False
 
     def remove_ref(self, raw_html):
-        cleanr = re.compile(r"<ref>.*?</ref>", re.DOTALL)
-        return re.sub(cleanr, "", raw_html)
+        return REF_PATTERN.sub("", raw_html)
 
     def remove_duplicates(self, input_list):
         seen = set()  # A set to keep track of seen elements
@@ -213,12 +301,102 @@ class Wikidict():
         return result
 
 
-    def render_wikitext(self, wikitext):
+    @staticmethod
+    def markup_spans(wikidef):
+        """Return the links and templates of a parsed text as sorted (start, end, is_template, node)."""
+        spans = [(*link.span, False, link) for link in wikidef.wikilinks]
+        spans += [(*tmpl.span, True, tmpl) for tmpl in wikidef.templates]
+        spans.sort(key=lambda span: (span[0], -span[1]))
+        return spans
+
+    @staticmethod
+    def spans_within(spans, span_starts, start, end):
+        """Spans lying entirely in [start, end), with offsets made relative to `start`."""
+        within = []
+        for i in range(bisect.bisect_left(span_starts, start), len(spans)):
+            span_start, span_end, is_template, node = spans[i]
+            if span_start >= end:
+                break
+            if span_end <= end:
+                within.append((span_start - start, span_end - start, is_template, node))
+        return within
+
+    def render_wikitext(self, wikitext, spans=None):
+        """Render one definition line to markdown.
+
+        `spans` are the links and templates of the line with offsets relative
+        to it, as given by `markup_spans`; the line is parsed when omitted.
+        """
         logger.debug(f"Processing wikitext: {wikitext}")
         if self.is_only_wiki_templates(wikitext):
             logger.debug("Rejected wikitext because it look like templates only")
             logger.debug("---")
             return ""
+        if spans is None:
+            import wikitextparser as wtp
+            spans = self.markup_spans(wtp.parse(wikitext))
+        rendered = self._render_spans(wikitext, spans)
+        if rendered is None:
+            logger.debug("Markup is nested or unbalanced, falling back to chunk rendering")
+            rendered = self._render_chunks(wikitext)
+        if rendered is None:
+            return ""
+
+        clean_text = self.remove_ref(rendered.replace("'''", "**").replace("''", "*")[2:])
+
+        # return rendered text, adapted to markdown
+        has_words = self.has_words(clean_text)
+
+        logger.debug(f"(3rd pass) Processed wikitext: {has_words=} {clean_text}")
+
+        if has_words:
+            logger.debug("+++")
+            return clean_text.strip()
+        else:
+            logger.debug("---")
+            return ""
+
+    def _render_spans(self, wikitext, spans):
+        """Single pass over flat markup, replacing every link and template span in place.
+
+        Returns None when the markup is nested (templates in templates or in
+        links) or when brackets are left unmatched, as `_render_chunks`
+        handles those in its own peculiar way.
+        """
+        out = []
+        pos = 0
+        template_end = -1
+        for start, end, is_template, node in spans:
+            if start < pos:
+                # links inside a template are replaced along with it
+                if is_template or end > template_end:
+                    return None
+                if has_markup_brackets(node.text or node.title):
+                    return None
+                continue
+            text = wikitext[pos:start]
+            if has_markup_brackets(text):
+                return None
+            out.append(text)
+            if is_template:
+                rendered = self.rules.render_template(node.name, node.arguments)
+                if rendered is not None:
+                    out.append(rendered)
+                template_end = end
+            else:
+                content = node.text or node.title
+                if has_markup_brackets(content):
+                    return None
+                out.append(content)
+            pos = end
+        text = wikitext[pos:]
+        if has_markup_brackets(text):
+            return None
+        out.append(text)
+        return "".join(out)
+
+    def _render_chunks(self, wikitext):
+        import wikitextparser as wtp
         wikidef = wtp.parse(wikitext)
         links = []
         templates = []
@@ -234,7 +412,7 @@ class Wikidict():
         )
         chunks_out = []
         for chunk in chunks:
-            if re.match(r"\[\[.*\]\]", chunk) and links:
+            if LINK_CHUNK_PATTERN.match(chunk) and links:
                 chunks_out += [links.pop(0)]
             else:
                 chunks_out += [chunk]
@@ -243,30 +421,9 @@ class Wikidict():
 
         # resolve templates names
         for tmpl in wikidef.templates:
-            logger.debug(f"Resolving template {tmpl.arguments} ; name={tmpl.name}")
-
-            if (len(tmpl.arguments) and tmpl.arguments[0].value in ("fr", "1")) or (
-                len(tmpl.arguments) == 0 and len(tmpl.name) > 3
-            ):
-                templates += [f"({tmpl.name.capitalize()})"]
-            elif len(tmpl.arguments) and tmpl.name in ("w", "lien", "lexique", "info lex", "term"):
-                if tmpl.name not in ("lexique",) and str(tmpl.arguments[-1])[-2:] == self.lang:
-                    templates += [str(tmpl.arguments[0])[1:]]
-                else:
-                    templates += ["(" + str(tmpl.arguments[0])[1:] + ")"]
-            elif len(tmpl.arguments) and tmpl.name in ("lb",):
-                templates += ["(" + str(tmpl.arguments[-1])[1:] + ")"]
-            elif (
-                len(tmpl.arguments)
-                and tmpl.name.startswith('variante')
-                and tmpl.name.endswith('de')
-                and tmpl.arguments[-1].value == self.lang
-            ):
-                templates += [f"Variante de {tmpl.arguments[0].value}"]
-            elif tmpl.name in ("exemple ", "exemple"):
-                templates += [None]
-            else:
-                templates += [tmpl.name]
+            args = tmpl.arguments
+            logger.debug(f"Resolving template {args} ; name={tmpl.name}")
+            templates += [self.rules.render_template(tmpl.name, args)]
 
             logger.debug(f"Resolved to {templates[-1]}")
 
@@ -276,7 +433,7 @@ class Wikidict():
         logger.debug(chunks)
         chunks_out = []
         for chunk in chunks:
-            if re.match(r"\{\{.*\}\}", chunk) and len(templates) > 0:
+            if TEMPLATE_CHUNK_PATTERN.match(chunk) and len(templates) > 0:
                 template_resolved = templates.pop(0)
                 checks = (
                     template_resolved is None,
@@ -290,28 +447,29 @@ class Wikidict():
         for chunk in chunks_out:
             if chunk.startswith("{{"):
                 logger.debug("Rejected wikitext because it looks like a wrongly rendered wiki template")
-                return ""
+                return None
 
         logger.debug(f"(2st pass) Processed wikitext: {chunks_out}")
+        return "".join(chunks_out)
 
-        clean_text = self.remove_ref("".join(chunks_out).replace("'''", "**").replace("''", "*")[2:])
-
-        # return rendered text, adapted to markdown
-        has_words = self.has_words(clean_text)
 
-        logger.debug(f"(3rd pass) Processed wikitext: {has_words=} {clean_text}")
-
-        if has_words:
-            logger.debug("+++")
-            return clean_text.strip()
-        else:
-            logger.debug("---")
-            return ""
+    def get_random_word(self):
+        self.load_list()  # picks up a reloaded list if the exclude file changed
+        return INDEXES.get(self).sample(self.difficulty)
 
+    def known_playable(self):
+        """{word: whether it has a usable definition} for the words already rendered, no network involved."""
+        playable = DEFINITIONS.playable(self.wiki_slug)
+        if self.offline_store.exists():
+            playable.update(self.offline_store.playable())
+        return playable
 
+    def mark_unplayable(self, word, reported=False):
+        INDEXES.mark_unplayable(self, word, reported)
 
-    def get_random_word(self):
-        return random.choice(self.WORDS)
+    def record_result(self, word, solved):
+        """Record whether `word` was found in a game, for its difficulty."""
+        INDEXES.record_result(self, word, solved)
 
 
     # ================
@@ -326,7 +484,9 @@ class Wikidict():
             return 0
 
         special_char_count = sum(1 for c in sentence if c in string.punctuation)
-        valid_word_count = sum(1 for word in words_in_sentence if word.lower() in self.WORDS)
+        valid_word_count = 0
+        if self.wordlist is not None:  # not loaded yet when bootstrapping from a dump
+            valid_word_count = sum(1 for word in words_in_sentence if self.wordlist.contains(word))
 
         # Heuristic scores can be weighted as necessary
         score = valid_word_count - special_char_count + num_words
@@ -346,16 +506,28 @@ class Wikidict():
         return [sentence for sentence, score in sorted_sentences]
 
     def remove_similar_sentences(self, sentences):
+        # fuzz.ratio(a, b) can't exceed 2 * min(len) / (len(a) + len(b)), so only kept
+        # sentences with a close enough length are worth comparing; they are kept
+        # sorted by length to find those with a bisection
+        from fuzzywuzzy import fuzz
         unique_sentences = []
+        kept_lengths = []
+        kept_by_length = []
         for sentence in sentences:
-            if not any(fuzz.ratio(sentence, unique_sentence) >= 80 for unique_sentence in unique_sentences):
+            length = len(sentence)
+            low = bisect.bisect_left(kept_lengths, math.floor(length * SIMILAR_LENGTH_RATIO))
+            high = bisect.bisect_right(kept_lengths, math.ceil(length / SIMILAR_LENGTH_RATIO))
+            if not any(fuzz.ratio(sentence, unique_sentence) >= SIMILARITY_THRESHOLD for unique_sentence in kept_by_length[low:high]):
                 unique_sentences.append(sentence)
+                i = bisect.bisect_right(kept_lengths, length)
+                kept_lengths.insert(i, length)
+                kept_by_length.insert(i, sentence)
         return unique_sentences
 
     def is_only_wiki_templates(self,s):
         s = s.replace("#","")
         remainder = s
-        templates = re.findall(r'(\{\{.*?\}\}|\[\[.*?\]\])', s, re.DOTALL)
+        templates = MARKUP_PATTERN.findall(s)
         for t in templates:
             remainder = remainder.replace(t,"")
         if len(remainder.strip()) < 3:
@@ -365,23 +537,117 @@ class Wikidict():
     def mask_sentences(self, sentences, word):
         return [s.replace(word, "_" * len(word)).replace(word.capitalize(), "_" * len(word)) for s in sentences]
 
+    def _stored_definition(self, word):
+        definition = self.offline_store.get(word) if self.offline_store.exists() else OFFLINE_MISS
+        if definition is OFFLINE_MISS and OFFLINE:
+            return None
+        return definition
+
     def get_definition(self, word):
+        definition = self._stored_definition(word)
+        if definition is not OFFLINE_MISS:
+            return definition
+        return DEFINITIONS.lookup(self.wiki_slug, word, self._fetch_definition)
+
+    def get_definitions(self, words):
+        """Batch version of `get_definition`, returning {word: definition or None}.
+
+        Words missing from the offline store and the cache are fetched
+        MAX_TITLES_PER_QUERY pages per request, redirections being followed
+        by the API. Words whose fetch failed are left out.
+        """
+        definitions = {}
+        remaining = []
+        for word in words:
+            definition = self._stored_definition(word)
+            if definition is OFFLINE_MISS:
+                remaining.append(word)
+            else:
+                definitions[word] = definition
+        definitions.update(DEFINITIONS.lookup_many(self.wiki_slug, remaining, self._fetch_definitions))
+        return definitions
+
+    def _fetch_definition(self, word):
+        wikitext = self.fetch_wikitext(word)
+        if wikitext is None:
+            return
+        return self.definition_from_wikitext(word, wikitext)
+
+    def _fetch_definitions(self, words):
+        pages = self.fetch_wikitexts(words)
+        definitions = {}
+        for word in words:
+            if word in pages:
+                title, wikitext = pages[word]
+                definition = self.definition_from_wikitext(title, wikitext) if wikitext is not None else None
+            else:  # the API truncated the batch, fall back to a single query
+                definition = self._fetch_definition(word)
+                if isinstance(definition, tuple):
+                    definition = self._fetch_definition(definition[1])
+            definitions[word] = None if isinstance(definition, tuple) else definition
+        return definitions
+
+    def fetch_wikitexts(self, words):
+        """Return {word: (page title, wikitext or None)} for the pages the API answered."""
+        params = {
+            "format": "json",
+            "action": "query",
+            "prop": "revisions",
+            "rvprop": "content",
+            "rvslots": "main",
+            "redirects": "1",
+            "formatversion": "2",
+        }
+        aliases = {}
+        contents = {}
+        for data in HTTP.get_titles(self.api_endpoint, params, words, batch_size=MAX_TITLES_PER_QUERY):
+            query = data.get("query", {})
+            for alias in query.get("normalized", []) + query.get("redirects", []):
+                aliases[alias["from"]] = alias["to"]
+            for page in query.get("pages", []):
+                if page.get("missing") or page.get("invalid"):
+                    contents[page["title"]] = None
+                elif page.get("revisions"):
+                    contents[page["title"]] = page["revisions"][0]["slots"]["main"]["content"]
+        pages = {}
+        for word in words:
+            title = word
+            for _ in range(3):  # normalization, then redirections
+                title = aliases.get(title, title)
+            if title in contents:
+                pages[word] = (title, contents[title])
+        return pages
+
+    def fetch_wikitext(self, word):
         params = {
             "format": "json",
             "action": "parse",
             "prop": "wikitext",
             "page": word,
         }  # &prop=sections
-        r = requests.get(url=self.api_endpoint, params=params)
-        if not r.json().get("parse"):
+        data = HTTP.get_json(self.api_endpoint, params)
+        if not data.get("parse"):
             return
+        return data["parse"]["wikitext"]["*"]
+
+    def definition_from_wikitext(self, word, r):
+        return self.render_definition(word, r)[0]
 
-        r = r.json()["parse"]["wikitext"]["*"]
+    def render_definition(self, word, r):
+        """Return (definition, rejection reason) for the wikitext of `word`.
+
+        A rejected page gives (None, reason), a redirection ((False, target), "redirect").
+        """
         logger.debug(r)
         # some redirection, usually because ’ != '
         if r.find("#REDIRECT [[") != -1:
-            return (False, r[len("#REDIRECT [[") : -2])
+            return (False, r[len("#REDIRECT [[") : -2]), "redirect"
+        # imported on first use: importing the parser is most of the bot's startup time
+        import wikitextparser as wtp
         w = wtp.parse(r)
+        # the page is parsed once, each line then gets the spans that fall within it
+        spans = self.markup_spans(w)
+        span_starts = [span[0] for span in spans]
         definitions = []
         for section in w.sections:
             title = str(section.title).strip()
@@ -392,9 +658,12 @@ class Wikidict():
                 "en": title
             }
             if definition_filters[self.wiki_config['wiki_lang']]:
+                line_start = section.span[0]
                 for line in str(section).split("\n"):
                     if len(line) > 2 and line[0] == "#" and line[1] != "*":
-                        definitions += [self.render_wikitext(line)]
+                        line_spans = self.spans_within(spans, span_starts, line_start, line_start + len(line))
+                        definitions += [self.render_wikitext(line, line_spans)]
+                    line_start += len(line) + 1
 
         logger.debug("Filtering and sorting definitions ...")
         definitions = self.remove_duplicates(definitions)
@@ -417,38 +686,60 @@ class Wikidict():
         for definition in definitions:
             if word_mask in definition:
                 masked_count += 1
-            for regex in self.wiki_config.get("avoid-regex", []):
-                definition_clean = definition.replace("*","")
-                logger.debug(f"Checking definition ({definition_clean}) against {regex} ...")
-                r = re.compile(regex)
-                if r.match(definition_clean):
-                    to_avoid += 1
-                    logger.warning("Matched !")
+            if self.rules.is_to_avoid(definition):
+                to_avoid += 1
+                logger.warning(f"Definition matched an avoid-regex: {definition}")
 
         if masked_count == definition_count and masked_count != 0:
             logger.debug("Too many masked definitions, giving up")
-            return
+            return None, "masked"
         if to_avoid == definition_count and to_avoid != 0:
             logger.debug("Too many 'to-avoid' regex matched, giving up")
-            return
+            return None, "avoid-regex"
         if definition_count == 0:
             logger.debug("No definition found, giving up")
-            return
+            return None, "no-definition"
 
         out = "\n".join([f"➥ `{d}`" for d in definitions])
         if len(out) > 2000:
             logger.debug("Final definition is too long, giving up")
-            return
+            return None, "too-long"
         else:
             logger.debug("Passed all checks !")
-            return out
+            return out, None
 
 
+    def start_prefetch(self):
+        # no-op when EYF_PREFETCH_DEPTH is 0 or the dictionary is already prefetched
+        PREFETCHERS.start(self)
+
+    def get_prefetch_stats(self):
+        prefetcher = PREFETCHERS.get(self.prefetch_key)
+        return prefetcher.stats() if prefetcher else None
+
     def get_word_and_definition(self):
         if self.forced_words:
             word, definition = self.forced_words.pop(0)
             return html.unescape(word).replace("œ", "oe"), html.unescape(definition)
 
+        prefetcher = PREFETCHERS.get(self.prefetch_key)
+        if prefetcher is not None:
+            word, definition = prefetcher.take()
+        else:
+            word, definition = self.pick_word_and_definition()
+        definition = html.unescape(definition)
+        return html.unescape(word).replace("œ", "oe"), definition
+
+    def pick_words_and_definitions(self, count):
+        """Sample `count` words and return the (word, definition) pairs that are playable."""
+        words = {self.get_random_word() for _ in range(count)}
+        definitions = self.get_definitions(words)
+        for word, definition in definitions.items():
+            if definition is None:
+                self.mark_unplayable(word)
+        return [(word, definition) for word, definition in definitions.items() if definition]
+
+    def pick_word_and_definition(self):
         definition = None
         word = None
         while definition is None:
@@ -457,36 +748,8 @@ class Wikidict():
                 definition = self.get_definition(word)
                 if isinstance(definition, tuple):  # got a redirection
                     definition = self.get_definition(definition[1])
+                if definition is None:
+                    self.mark_unplayable(word)
             except Exception as e:
                 logger.warning(f"Exception while picking new word: {e}")
-        definition = html.unescape(definition)
-        return html.unescape(word).replace("œ", "oe"), definition
-
-problematic = (
-    # "saccarifier",
-    # "tronquer",
-    # "physiques",
-    # "canada",
-    # "gousse",
-    # "mont",
-    # "soucie",
-    # "encercler",
-    # "cuivreux",
-    # "insupportables"
-    # "prononcées",
-    #"attente"
-)
-
-w = Wikidict()
-
-for word in problematic:
-    logger.debug(word)
-    print(w.get_definition(word))
-
-#raise Exception("done")
-
-while False:
-    word, definition = w.get_word_and_definition()
-    logger.debug(word)
-    print(definition)
-    time.sleep(3)
+        return word, definition
@@ -0,0 +1,80 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+HTTP_TIMEOUT = float(os.getenv("EYF_HTTP_TIMEOUT", "10"))  # seconds
+HTTP_RETRIES = int(os.getenv("EYF_HTTP_RETRIES", "3"))
+HTTP_CONCURRENCY = int(os.getenv("EYF_HTTP_CONCURRENCY", "4"))
+# e.g. http://localhost:8900/w/api.php to play against wiki_standin.py instead of wiktionary
+API_ENDPOINT_OVERRIDE = os.getenv("EYF_WIKI_API_URL")
+USER_AGENT = "EnlargeYourFrench/2.0 (https://github.com/mortrevere/EnlargeYourFrench)"
+MAX_TITLES_PER_QUERY = 50  # MediaWiki limit for non-bot clients
+
+
+class WikiClient:
+    """Shared HTTP client for every wiktionary request.
+
+    Connections are kept alive and pooled, every request has a timeout and is
+    retried with exponential backoff on network errors and 429/5xx answers,
+    and no more than `concurrency` requests are in flight at once. The
+    session, and `requests` itself, are only set up for the first request.
+    """
+
+    def __init__(self, timeout=HTTP_TIMEOUT, retries=HTTP_RETRIES, concurrency=HTTP_CONCURRENCY):
+        self.timeout = timeout
+        self.retries = retries
+        self.concurrency = concurrency
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self._session = None
+        self.lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self.lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                session = requests.Session()
+                session.headers["User-Agent"] = USER_AGENT
+                retry = Retry(
+                    total=self.retries,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=("GET",),
+                )
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency, max_retries=retry)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    @staticmethod
+    def endpoint(lang):
+        return API_ENDPOINT_OVERRIDE or f"https://{lang}.wiktionary.org/w/api.php"
+
+    def get_json(self, endpoint, params):
+        with self.slots:
+            response = self.session.get(endpoint, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def get_many(self, endpoint, params_list):
+        """Run several queries concurrently, returning their JSON answers in order."""
+        if len(params_list) <= 1:
+            return [self.get_json(endpoint, params) for params in params_list]
+        with ThreadPoolExecutor(min(self.concurrency, len(params_list))) as pool:
+            return list(pool.map(lambda params: self.get_json(endpoint, params), params_list))
+
+    def get_titles(self, endpoint, params, titles, batch_size=MAX_TITLES_PER_QUERY):
+        """Query `titles` in batches of `batch_size` per request, concurrently."""
+        titles = list(titles)
+        params_list = [
+            {**params, "titles": "|".join(titles[i:i + batch_size])}
+            for i in range(0, len(titles), batch_size)
+        ]
+        return self.get_many(endpoint, params_list)
+
+
+HTTP = WikiClient()
@@ -0,0 +1,208 @@
+import mmap
+import os
+import random
+import struct
+import threading
+import unicodedata
+from array import array
+
+from loguru import logger
+
+
+def fold(word):
+    """Lowercase `word` and strip its accents, "Élève" -> "eleve"."""
+    decomposed = unicodedata.normalize("NFKD", word.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+MAGIC = b"EYFW"
+VERSION = 1
+MAX_LENGTH = 64  # words are grouped by length, longer ones all go in the last group
+KNOWN_WORDS_CACHE_SIZE = int(os.getenv("EYF_KNOWN_WORDS_CACHE_SIZE", "20000"))  # see WordList.contains
+HEADER = struct.Struct("=4sII")  # magic, version, word count
+
+
+def list_length(word):
+    return min(len(word), MAX_LENGTH)
+
+
+def compile_list(source, target):
+    """Compile a text word list, one word per line, into the binary format of `WordList`.
+
+    The file is a header, the index of the first word of every length group,
+    the (count + 1) offsets of the words in the blob, then the UTF-8 blob.
+    Integers are in native byte order: the file is a local cache of the
+    `.txt` list, rebuilt whenever the list is newer.
+    """
+    with open(source, mode="r", encoding="utf8") as f:
+        words = {line.strip() for line in f}
+    words.discard("")
+    entries = sorted((list_length(word), word.encode("utf8")) for word in words)
+
+    starts = array("I", [0] * (MAX_LENGTH + 2))
+    offsets = array("I", [0])
+    blob = bytearray()
+    for length, encoded in entries:
+        starts[length + 1] += 1
+        blob += encoded
+        offsets.append(len(blob))
+    for length in range(1, MAX_LENGTH + 2):
+        starts[length] += starts[length - 1]
+
+    tmp = f"{target}.tmp"
+    with open(tmp, mode="wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        f.write(starts.tobytes())
+        f.write(offsets.tobytes())
+        f.write(blob)
+    os.replace(tmp, target)
+    logger.info(f"Compiled {len(entries)} words from {source} to {target}")
+
+
+class WordList:
+    """Word list of one dictionary, memory-mapped and shared by every game using it.
+
+    Words are sorted by (length, UTF-8 bytes) in one blob, next to their
+    offsets, so that sampling, length filtering and membership only decode
+    the few words they look at, and the list costs no Python objects.
+    Excluded words stay in the file and are skipped through `excluded`.
+    """
+
+    def __init__(self, path, excluded, exclude_mtime):
+        with open(path, mode="rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size = HEADER.unpack_from(self.mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a compiled word list, delete it to rebuild it")
+        view = memoryview(self.mm)
+        position = HEADER.size
+        self.starts = view[position:position + 4 * (MAX_LENGTH + 2)].cast("I")
+        position += 4 * (MAX_LENGTH + 2)
+        self.offsets = view[position:position + 4 * (self.size + 1)].cast("I")
+        self.blob_start = position + 4 * (self.size + 1)
+        self.excluded = {word for word in excluded if self.index_of(word) is not None}
+        self.exclude_mtime = exclude_mtime
+        self.known_words = {}  # lowercased word -> in the list
+        self.lock = threading.Lock()
+
+    def _encoded(self, i):
+        return self.mm[self.blob_start + self.offsets[i]:self.blob_start + self.offsets[i + 1]]
+
+    def word_at(self, i):
+        return self._encoded(i).decode("utf8")
+
+    def index_of(self, word):
+        encoded = word.encode("utf8")
+        length = list_length(word)
+        low, high = self.starts[length], self.starts[length + 1]
+        while low < high:
+            middle = (low + high) // 2
+            if self._encoded(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.starts[length + 1] and self._encoded(low) == encoded:
+            return low
+        return None
+
+    def __len__(self):
+        return self.size - len(self.excluded)
+
+    def __contains__(self, word):
+        return word not in self.excluded and self.index_of(word) is not None
+
+    def __iter__(self):
+        for i in range(self.size):
+            word = self.word_at(i)
+            if word not in self.excluded:
+                yield word
+
+    def remove(self, word):
+        with self.lock:
+            if word in self.excluded or self.index_of(word) is None:
+                return False
+            self.excluded.add(word)
+            self.known_words.pop(word, None)
+            return True
+
+    def sample(self, min_length=1, max_length=MAX_LENGTH):
+        """Uniformly pick a word that has from `min_length` to `max_length` characters."""
+        low = self.starts[min(min_length, MAX_LENGTH)]
+        high = self.starts[min(max_length, MAX_LENGTH) + 1]
+        if low >= high:
+            raise IndexError("no word of this length")
+        for _ in range(100):
+            word = self.word_at(random.randrange(low, high))
+            if word not in self.excluded:
+                return word
+        # nearly everything was excluded, don't rely on luck
+        return random.choice([word for word in map(self.word_at, range(low, high)) if word not in self.excluded])
+
+    def contains(self, word):
+        """Whether `word`, lowercased, is in the list, for ranking definitions.
+
+        Answers are remembered, up to KNOWN_WORDS_CACHE_SIZE words: definitions
+        keep using the same words, and each new one costs a bisection of the map.
+        """
+        word = word.lower()
+        known = self.known_words.get(word)
+        if known is None:
+            known = word in self
+            if len(self.known_words) >= KNOWN_WORDS_CACHE_SIZE:
+                self.known_words.clear()
+            self.known_words[word] = known
+        return known
+
+
+class WordListRegistry:
+    """Process-wide registry of word lists, one per `Wikidict.WIKIS` slug.
+
+    A list is compiled from its `.txt` file (see `compile_list`) and mapped
+    the first time a dictionary is used, then handed out as-is. It is only
+    reloaded when its exclude file has been modified by someone else than
+    this registry.
+    """
+
+    def __init__(self):
+        self.LISTS = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def get(self, wikidict):
+        with self.lock:
+            wordlist = self.LISTS.get(wikidict.wiki_slug)
+            exclude_mtime = self._mtime(wikidict.exclude_file)
+            if wordlist is None or wordlist.exclude_mtime != exclude_mtime:
+                wordlist = self._load(wikidict)
+                self.LISTS[wikidict.wiki_slug] = wordlist
+            return wordlist
+
+    def _load(self, wikidict):
+        if not os.path.exists(wikidict.list_file):
+            wikidict.create_list_file()
+        binary_file = wikidict.list_file.with_suffix(".bin")
+        if self._mtime(binary_file) is None or self._mtime(binary_file) < self._mtime(wikidict.list_file):
+            compile_list(wikidict.list_file, binary_file)
+        logger.info(f"Loading word list {binary_file} ...")
+        return WordList(binary_file, wikidict.load_excluded(), self._mtime(wikidict.exclude_file))
+
+    def exclude(self, wikidict, word):
+        # an excluded word is gone for every game, so the shared pool is updated in place
+        with self.lock:
+            wikidict.exclude_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(wikidict.exclude_file, mode="a", encoding="utf8") as f:
+                f.write(word + "\n")
+            wordlist = self.LISTS.get(wikidict.wiki_slug)
+            if wordlist is None:
+                return
+            wordlist.remove(word)
+            wordlist.exclude_mtime = self._mtime(wikidict.exclude_file)
+
+
+WORDLISTS = WordListRegistry()
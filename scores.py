@@ -1,24 +1,62 @@
 import json
+import sqlite3
+import threading
 from pathlib import Path
 
 MODULE_DIR = Path(__file__).resolve().parent
 DATA_DIR = MODULE_DIR / "data"
-SCORES_FILE = DATA_DIR / "high_scores.json"
+SCORES_FILE = DATA_DIR / "high_scores.json"  # legacy store, migrated on first start
+SCORES_DB = DATA_DIR / "scores.sqlite3"
 
 class ScoreHandler():
-    def __init__(self):
+    """Per channel and player scores, kept in memory and persisted in SQLite.
+
+    The database is in WAL mode: finishing a game appends the rows of its
+    players in one transaction, so it costs the same whatever the history,
+    and a crash can never leave a half-written store behind.
+    """
+
+    def __init__(self, path=SCORES_DB):
         self.GLOBAL_SCORES = {}
-        self.GLOBAL_SCORES.clear()
-        if not SCORES_FILE.exists():
-            return
+        self.lock = threading.Lock()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " channel TEXT NOT NULL,"
+            " player TEXT NOT NULL,"
+            " total_points INTEGER NOT NULL,"
+            " games_played INTEGER NOT NULL,"
+            " win_rate REAL NOT NULL,"
+            " PRIMARY KEY (channel, player)) WITHOUT ROWID"
+        )
+        for channel, player, total_points, games_played, win_rate in self.db.execute("SELECT * FROM scores"):
+            self.GLOBAL_SCORES.setdefault(channel, {})[player] = {
+                "total_points": total_points, "games_played": games_played, "win_rate": win_rate
+            }
+        if not self.GLOBAL_SCORES and SCORES_FILE.exists():
+            self._migrate_json()
+
+    def _migrate_json(self):
         with open(SCORES_FILE, mode="r", encoding="utf-8") as f:
             self.GLOBAL_SCORES = json.load(f)
-        print(self.GLOBAL_SCORES)
+        print(f"Migrating {SCORES_FILE} to {self.path}")
+        with self.db:
+            for channel, players in self.GLOBAL_SCORES.items():
+                self.save(channel, players)
+        SCORES_FILE.rename(SCORES_FILE.with_suffix(".json.migrated"))
 
-    def save(self):
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        with open(SCORES_FILE, mode="w", encoding="utf-8") as f:
-            json.dump(self.GLOBAL_SCORES, f, ensure_ascii=False, indent=2)
+    def save(self, channel, players):
+        self.db.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+            [
+                (channel, player, score["total_points"], score["games_played"], score["win_rate"])
+                for player, score in players.items()
+            ],
+        )
 
     def update(self, channel, game_scores): # channel is a unique str id, game_score is dict player_id (int) -> score (int)
         # find maximum score, this player will get 1 point added to its win rate
@@ -29,30 +67,29 @@ class ScoreHandler():
             return
         print("max score is", max_score)
 
-        self.GLOBAL_SCORES.setdefault(channel, {})
-        clean_game_scores = {}
-        for k, v in game_scores.items():
-            clean_game_scores[str(k)] = game_scores[k]
-        game_scores = clean_game_scores
-        for player in game_scores:
-            player = str(player)
-            game_performance = game_scores[player]/max_score # 1 for the best player, proportionaly less for the others, always in [0,1]
-
-            self.GLOBAL_SCORES[channel].setdefault(player, {"total_points": 0, "games_played": 0, "win_rate": 0})
-            self.GLOBAL_SCORES[channel][player]["total_points"] += game_scores[player]
-            self.GLOBAL_SCORES[channel][player]["games_played"] += 1
-            self.GLOBAL_SCORES[channel][player]["win_rate"] = (self.GLOBAL_SCORES[channel][player]["win_rate"]*(self.GLOBAL_SCORES[channel][player]["games_played"]-1) + game_performance)/self.GLOBAL_SCORES[channel][player]["games_played"]
-        self.save()
+        with self.lock:
+            self.GLOBAL_SCORES.setdefault(channel, {})
+            clean_game_scores = {}
+            for k in game_scores:
+                clean_game_scores[str(k)] = game_scores[k]
+            game_scores = clean_game_scores
+            for player in game_scores:
+                player = str(player)
+                game_performance = game_scores[player]/max_score # 1 for the best player, proportionaly less for the others, always in [0,1]
+
+                self.GLOBAL_SCORES[channel].setdefault(player, {"total_points": 0, "games_played": 0, "win_rate": 0})
+                self.GLOBAL_SCORES[channel][player]["total_points"] += game_scores[player]
+                self.GLOBAL_SCORES[channel][player]["games_played"] += 1
+                self.GLOBAL_SCORES[channel][player]["win_rate"] = (self.GLOBAL_SCORES[channel][player]["win_rate"]*(self.GLOBAL_SCORES[channel][player]["games_played"]-1) + game_performance)/self.GLOBAL_SCORES[channel][player]["games_played"]
+            with self.db:
+                self.save(channel, {player: self.GLOBAL_SCORES[channel][player] for player in game_scores})
 
     def get_scores(self, channel):
         scores = self.GLOBAL_SCORES.get(channel)
         if not scores:
             return None
 
-        print(scores)
-
         sorted_keys = sorted(scores.keys(), key=lambda k: scores[k]["win_rate"], reverse=True)
-        print(sorted_keys)
         return "\n".join(
             [
                 f'<@{player}> : {scores[player]["total_points"]} ({scores[player]["games_played"]} partie{"s" if scores[player]["games_played"] > 1 else ""} : {round(scores[player]["win_rate"]*100,1)} % de victoire)'
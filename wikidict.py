@@ -7,6 +7,8 @@ import os
 import math
 from pathlib import Path
 import wikitextparser as wtp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 VOWELS = "aeiouy"
 CONSONANTS = "bcdfghjklmnpqrstvwz"
@@ -31,6 +33,11 @@ WIKIS = {
 
 LANG = "fr"  # TODO temporary
 
+HTTP_TIMEOUT = 10  # seconds
+# one keep-alive session for every wiktionary request, retried with backoff
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))))
+
 
 def create_list_file(lang):
     print("loading from API...")
@@ -50,7 +57,7 @@ def create_list_file(lang):
             start = False
             if cont_key is not None:
                 params["cmcontinue"] = cont_key
-            response = requests.get(url=WIKIS[lang].api_endpoint, params=params)
+            response = SESSION.get(url=WIKIS[lang].api_endpoint, params=params, timeout=HTTP_TIMEOUT)
             data = response.json()
             cont_key = None
             if "continue" in data and "cmcontinue" in data["continue"]:
@@ -95,7 +102,7 @@ def load_excluded(lang):
 
 
 def exclude(word, lang="fr"):
-    WORDS.remove(word)
+    get_words().remove(word)
     with open(WIKIS[lang].exclude_file, mode="a", encoding="utf8") as f:
         f.write(word + "\n")
 
@@ -112,9 +119,16 @@ def load_list(lang) -> List[str]:
         ]
 
 
-print("loading wiktionary words...")
-WORDS = load_list(LANG)  # TODO temporary
-print(f"loaded {len(WORDS)} words")
+WORDS = None  # TODO temporary, loaded by the first game rather than on import
+
+
+def get_words() -> List[str]:
+    global WORDS
+    if WORDS is None:
+        print("loading wiktionary words...")
+        WORDS = load_list(LANG)
+        print(f"loaded {len(WORDS)} words")
+    return WORDS
 
 # DEFINITION FETCHER
 
@@ -179,7 +193,7 @@ def render_wikitext(wikitext):
 
 
 def get_random_word() -> str:
-    return random.choice(WORDS)
+    return random.choice(get_words())
 
 
 def get_definition(word, lang) -> Optional[str]:
@@ -189,7 +203,7 @@ def get_definition(word, lang) -> Optional[str]:
         "prop": "wikitext",
         "page": word,
     }  # &prop=sections
-    r = requests.get(url=WIKIS[lang].api_endpoint, params=params)
+    r = SESSION.get(url=WIKIS[lang].api_endpoint, params=params, timeout=HTTP_TIMEOUT)
     if not r.json().get("parse"):
         return
 